@@ -1,20 +1,80 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
+from app.utils.metrics import instrument_engine
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# 커넥션 풀 설정 (요청량에 맞게 환경변수로 조정, /db/pool 에서 사용률 확인)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))          # 상시 유지 커넥션 수
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))    # 순간적으로 더 열 수 있는 커넥션 수
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # 풀이 다 찼을 때 기다리는 시간(초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 이 시간(초)이 지난 커넥션은 재연결
+# always: 체크아웃마다 SELECT 1 (안전하지만 왕복 1회 추가) / never: recycle 과 오류 시 재연결에 맡김
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always")
+
 class Base(DeclarativeBase):
 
     pass
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+def _pool_options() -> dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING == "always",
+        "pool_use_lifo": True,  # 최근 쓴 커넥션을 재사용해서 유휴 커넥션이 recycle 로 자연히 정리되게 함
+    }
+
+def _async_url(url: str) -> str:
+    # postgresql:// 또는 postgresql+psycopg2:// -> postgresql+asyncpg://
+    scheme, rest = url.split("://", 1)
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgres") else url
+
+engine = create_engine(DATABASE_URL, **_pool_options())
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# 읽기 전용 엔드포인트용 비동기 엔진 (스레드풀을 거치지 않고 이벤트 루프에서 바로 대기)
+async_engine = create_async_engine(
+    os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL), **_pool_options()
+)
+
+# 모든 쿼리 실행 시간을 /metrics 의 db_query 단계로 기록
+instrument_engine(engine)
+instrument_engine(async_engine)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_stats() -> dict:
+    """동기/비동기 엔진의 커넥션 풀 사용 현황."""
+    def stats(pool):
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "utilization": round(pool.checkedout() / (DB_POOL_SIZE + DB_MAX_OVERFLOW), 4),
+        }
+
+    return {
+        "sync": stats(engine.pool),
+        "async": stats(async_engine.sync_engine.pool),
+        "pre_ping": DB_POOL_PRE_PING,
+        "recycle": DB_POOL_RECYCLE,
+    }
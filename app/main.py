@@ -1,17 +1,49 @@
-from fastapi import FastAPI, Query
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 # from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
-from .db import Base, engine, SessionLocal
+from .db import Base, SessionLocal, engine, pool_stats
 from .models.model import Judgement
 from app.routers import router
+from app.services.chat_bot.models import batching_stats, readiness, start_warm_up
+from app.services.citations.graph import ensure_citation_schema
+from app.services.crawler.jobs import ensure_crawl_schema, runner as crawl_job_runner
+from app.services.crawler.pipeline import close_client
+from app.services.search.engine import ensure_search_schema, get_search_engine
+from app.services.search.facets import SearchFilters, ensure_facet_schema, facet_counts
+from app.services.search.pagination import SEARCH_TOTAL_MODE, TOTAL_MODES, format_total
+from app.utils.metrics import (
+    HTTP_REQUEST_SECONDS, METRICS_TIMING_HEADER, end_request_timings, registry, server_timing_header,
+    start_request_timings,
+)
 
 
 Base.metadata.create_all(bind=engine)
-app = FastAPI()
+ensure_search_schema(engine)
+ensure_facet_schema(engine)
+ensure_crawl_schema(engine)
+ensure_citation_schema(engine)
 
-app.include_router(router)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # MODEL_PRELOAD 에 지정된 모델을 백그라운드에서 로드 + 워밍업 (/ready 로 상태 확인)
+    start_warm_up()
+    # 미완료 백그라운드 크롤링 작업 재개
+    crawl_job_runner.start_watcher()
+    yield
+    await crawl_job_runner.shutdown()
+    # 크롤러 공유 HTTP 커넥션 풀 정리
+    await close_client()
+
+
+app = FastAPI(lifespan=lifespan)
 # 이제 판례 API에서 JSON 형식으로 가져오면 작동 함. 
 
 
@@ -21,19 +53,111 @@ app.include_router(router)
 #     allow_methods=["*"], allow_headers=["*"],
 # )
 
+DB_POOL_CHECKED_OUT = registry.gauge("app_db_pool_checked_out", "사용 중인 DB 커넥션 수", ("engine",))
+HF_QUEUE_DEPTH = registry.gauge("app_hf_batching_queue_depth", "허깅페이스 배치 추론 대기열 길이")
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    # 요청별 처리시간 히스토그램 + (옵션) 단계별 소요시간 Server-Timing 헤더
+    timings, token = start_request_timings()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        end_request_timings(token)
+        route = request.scope.get("route")
+        # 경로 변수 대신 라우트 템플릿으로 묶어서 라벨 수가 늘어나지 않게 함
+        HTTP_REQUEST_SECONDS.observe(
+            elapsed, method=request.method, route=getattr(route, "path", "unmatched"), status=status
+        )
+    if METRICS_TIMING_HEADER or request.headers.get("x-timing") == "1":
+        # 스트리밍 응답은 헤더가 먼저 나가므로 생성 전까지의 단계만 포함됨
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
+
+# Prometheus 수집용 메트릭 (단계별 지연 히스토그램, 법령 API 호출 수, 생성 토큰 수 등)
+@app.get("/metrics")
+def metrics():
+    for name, stats in pool_stats().items():
+        if isinstance(stats, dict):
+            DB_POOL_CHECKED_OUT.set(stats["checked_out"], engine=name)
+    hf = batching_stats()
+    if hf is not None:
+        HF_QUEUE_DEPTH.set(hf["queue_depth"])
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+# DB 커넥션 풀 사용 현황 (풀 크기 조정용)
+@app.get("/db/pool")
+def db_pool():
+    return pool_stats()
+
+# 트래픽을 받아도 되는지 (미리 로드할 모델이 모두 준비됐는지). 준비 전에는 503.
+@app.get("/ready")
+def ready():
+    state = readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
 @app.get("/api/v1/rulings/search")
-def search(q: str = Query("", min_length=0), limit: int = 10, offset: int = 0):
-    with SessionLocal() as db:  # type: Session
-        cond = (Judgement.case_name.ilike(f"%{q}%")) | (Judgement.case_precedent.ilike(f"%{q}%"))
-        stmt = select(Judgement).where(cond).limit(limit).offset(offset)
-        total_stmt = select(func.count()).select_from(select(Judgement).where(cond).subquery())
-        items = db.execute(stmt).scalars().all()
-        total = db.scalar(total_stmt) or 0
+async def search(
+    q: str = Query("", min_length=0),
+    limit: int = Query(10, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor. 주면 최신순 키셋 페이지네이션"),
+    paginate: str = Query("offset", pattern="^(offset|cursor)$"),
+    total: str = Query(SEARCH_TOTAL_MODE, description=f"total 계산 방식: {', '.join(TOTAL_MODES)}"),
+    court: Optional[str] = Query(None, description="법원명 필터"),
+    case_type: Optional[str] = Query(None, description="사건종류 필터"),
+    result_type: Optional[str] = Query(None, description="판결유형 필터"),
+    year_from: Optional[int] = Query(None, ge=1900, le=2100, description="선고연도 시작"),
+    year_to: Optional[int] = Query(None, ge=1900, le=2100, description="선고연도 끝"),
+    facets: bool = Query(False, description="법원/사건종류/판결유형/연도별 건수도 함께 반환"),
+):
+    if total not in TOTAL_MODES:
+        raise HTTPException(status_code=400, detail=f"total 은 {', '.join(TOTAL_MODES)} 중 하나여야 합니다.")
+    # ILIKE '%q%' 전체 스캔 대신 n-gram 색인 검색
+    search_engine = get_search_engine()
+    filters = SearchFilters(court, case_type, result_type, year_from, year_to)
+
+    def run():
+        with SessionLocal() as db:
+            return _run(db)
+
+    def _run(db: Session):
+        if cursor is not None or paginate == "cursor":
+            # 무한 스크롤: (case_date, id) 커서 기준으로 다음 페이지만 읽음
+            result = search_engine.search_after(db, q, limit, cursor=cursor, total_mode=total, filters=filters)
+        else:
+            # 관련도 순 + offset 페이지
+            result = search_engine.search(db, q, limit, offset, total_mode=total, filters=filters)
+        # 패싯 건수는 첫 페이지에서만 (검색어가 없으면 집계 표에서 바로 합산)
+        facet_result = facet_counts(db, search_engine, q, filters) if facets and cursor is None else None
         return {
-            "query": q, "limit": limit, "offset": offset, "total": total,
-            "items": [{"id": r.id, "title": r.case_name, "court": r.case_court, "date": r.case_date} for r in items],
-        }
\ No newline at end of file
+            "query": q, "limit": limit, "offset": offset,
+            "total": result.total, "total_exact": result.total_exact,
+            "total_display": format_total(result.total, result.total_exact),
+            "next_cursor": result.next_cursor,
+            "facets": facet_result,
+            "items": [
+                {"id": r.id, "title": r.case_name, "court": r.case_court, "date": r.case_date, "score": score}
+                for r, score in zip(result.items, result.scores)
+            ],
+        }
+
+    # 검색은 동기 세션 + CPU 작업(메모리 색인 점수 계산, 패싯 집계, 응답 변환)이라
+    # 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    try:
+        return await run_in_threadpool(run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# /api/v1/rulings/{case_number} 가 /api/v1/rulings/search 를 가리지 않도록 검색 라우트 뒤에 등록
+app.include_router(router)
@@ -1,7 +1,9 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Date, Text, DateTime, Integer, UniqueConstraint
+from sqlalchemy import Boolean, Column, String, Date, Text, DateTime, Integer, LargeBinary, UniqueConstraint, Index, ForeignKey, event, func, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from app.db import Base
+from app.services.search.tokenizer import search_document
 
 class Judgement(Base):
     __tablename__ = "judgements"
@@ -23,6 +25,9 @@ class Judgement(Base):
     reference = Column(String, nullable=True)                             # 참조조문
     reference_case = Column(Text, nullable=True)                          # 참조판례
     case_precedent = Column(Text, nullable=True)                          # 판례요지
+    source_id = Column(String(20), index=True, nullable=True)            # 원본 판례일련번호 (법령 API)
+    search_vector = Column(TSVECTOR, nullable=True)                       # 검색용 n-gram tsvector (저장 시 자동 갱신)
+    content_hash = Column(String(64), nullable=True)                      # 정규화한 본문의 sha256 (재수집 시 변경 감지)
 
     created_at = Column(DateTime, default=datetime.now, nullable=False)   # 생성일자
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)  # 수정일자 
@@ -30,4 +35,147 @@ class Judgement(Base):
     # 동일한 사건번호 + 날짜 조합은 중복 저장 방지
     __table_args__ = (
         UniqueConstraint("case_number", "case_date", name="uq_case_num_date"),
-    )
\ No newline at end of file
+        Index("ix_judgements_search_vector", "search_vector", postgresql_using="gin"),
+        # 키셋 페이지네이션 (case_date, id) 정렬용
+        Index("ix_judgements_date_id", "case_date", "id"),
+        # 필터 + 최신순 정렬 (법원/사건종류/판결유형 필터 후 case_date 순으로 바로 읽음)
+        Index("ix_judgements_court_date_id", "case_court", "case_date", "id"),
+        Index("ix_judgements_type_date_id", "case_type", "case_date", "id"),
+        Index("ix_judgements_result_type_date_id", "case_result_type", "case_date", "id"),
+        # 공백을 없앤 사건번호 (인용 간선의 cited_case_number 와 같은 표기) 로 조회
+        Index("ix_judgements_case_number_key", text("replace(case_number, ' ', '')")),
+    )
+
+
+class JudgementFacetCount(Base):
+    """(법원, 사건종류, 판결유형, 선고연도) 조합별 판례 수. judgements 트리거가 저장할 때마다 증감함.
+
+    검색어 없는 패싯 집계는 judgements 전체를 GROUP BY 하지 않고 이 작은 표만 합산함.
+    값이 없는 항목은 빈 문자열로 저장 (기본키에 NULL 을 쓸 수 없음).
+    """
+    __tablename__ = "judgement_facet_counts"
+
+    court = Column(String(100), primary_key=True)
+    case_type = Column(String(100), primary_key=True)
+    result_type = Column(String(100), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class JudgementCitation(Base):
+    """판례 -> 참조판례 사건번호 간선 (reference_case 를 파싱해서 저장). 인용된 판례가 DB 에 없어도 남김."""
+    __tablename__ = "judgement_citations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    judgement_id = Column(UUID(as_uuid=True), ForeignKey("judgements.id", ondelete="CASCADE"), nullable=False)
+    cited_case_number = Column(String(100), nullable=False)                # 공백 없이 정규화한 사건번호
+    position = Column(Integer, nullable=False, default=0)                 # 참조판례 안에서의 순서
+
+    __table_args__ = (
+        UniqueConstraint("judgement_id", "cited_case_number", name="uq_citation_edge"),
+        # 피인용(cited-by) 조회용
+        Index("ix_judgement_citations_cited", "cited_case_number", "judgement_id"),
+    )
+
+
+class JudgementStatuteRef(Base):
+    """판례 -> 참조조문(법령명 + 조) 간선 (reference 를 파싱해서 저장)."""
+    __tablename__ = "judgement_statute_refs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    judgement_id = Column(UUID(as_uuid=True), ForeignKey("judgements.id", ondelete="CASCADE"), nullable=False)
+    law_name = Column(String(255), nullable=False)                        # 예: 민법
+    article = Column(String(50), nullable=False)                          # 예: 제750조, 제10조의2
+    position = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("judgement_id", "law_name", "article", name="uq_statute_edge"),
+        # 조문별 인용 판례 조회용
+        Index("ix_judgement_statute_refs_article", "law_name", "article", "judgement_id"),
+    )
+
+
+class CitationIndexState(Base):
+    """판례별로 어떤 내용(content_hash) 기준으로 인용 간선을 만들었는지. 백필 시 바뀐 판례만 다시 파싱."""
+    __tablename__ = "citation_index_state"
+
+    judgement_id = Column(UUID(as_uuid=True), ForeignKey("judgements.id", ondelete="CASCADE"), primary_key=True)
+    content_hash = Column(String(64), nullable=True)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class JudgementEmbedding(Base):
+    """판례 임베딩 벡터 (의미 기반 검색용). 벡터는 float 배열을 bytes 로 그대로 저장."""
+    __tablename__ = "judgement_embeddings"
+
+    judgement_id = Column(UUID(as_uuid=True), ForeignKey("judgements.id", ondelete="CASCADE"), primary_key=True)
+    model_name = Column(String(255), nullable=False)                      # 임베딩 모델
+    dim = Column(Integer, nullable=False)                                 # 차원 수
+    vector = Column(LargeBinary, nullable=False)                          # float16 little-endian 배열
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class CrawlJob(Base):
+    """백그라운드 크롤링 작업. 키워드 + 페이지 범위를 페이지 단위 체크포인트로 진행함."""
+    __tablename__ = "crawl_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    keyword = Column(String(255), nullable=False)                         # 검색 키워드
+    page_start = Column(Integer, nullable=False, default=1)               # 시작 페이지
+    page_end = Column(Integer, nullable=True)                             # 끝 페이지 (없으면 빈 페이지까지)
+    resync = Column(Boolean, nullable=False, default=False)               # True 면 이미 가진 판례도 다시 조회
+    status = Column(String(20), index=True, nullable=False, default="pending")  # pending/running/done/failed/cancelled
+    next_page = Column(Integer, nullable=False, default=1)                # 다음에 처리할 페이지
+    pages_done = Column(Integer, nullable=False, default=0)
+    fetched = Column(Integer, nullable=False, default=0)                  # 조회한 판례 수
+    saved = Column(Integer, nullable=False, default=0)                     # 저장 성공
+    failed = Column(Integer, nullable=False, default=0)                    # 저장 실패
+    skipped = Column(Integer, nullable=False, default=0)                   # 이미 보유해서 건너뜀
+    inserted = Column(Integer, nullable=False, default=0)                  # 저장 성공 중 새로 추가
+    updated = Column(Integer, nullable=False, default=0)                   # 저장 성공 중 내용이 바뀌어 수정
+    unchanged = Column(Integer, nullable=False, default=0)                 # 저장 성공 중 내용이 같아 쓰지 않음
+    error = Column(Text, nullable=True)
+    lease_owner = Column(String(64), nullable=True)                       # 실행 중인 워커
+    lease_expires_at = Column(DateTime, nullable=True)                    # 워커가 죽으면 만료 후 다른 워커가 이어받음
+
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class CrawlJobPage(Base):
+    """크롤링 작업의 페이지별 체크포인트."""
+    __tablename__ = "crawl_job_pages"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("crawl_jobs.id", ondelete="CASCADE"), index=True, nullable=False)
+    page = Column(Integer, nullable=False)
+    ids = Column(Integer, nullable=False, default=0)                      # 목록에서 받은 판례 수
+    saved = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    finished_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "page", name="uq_crawl_job_page"),
+    )
+
+
+def search_vector_expr(case_name: str | None, case_precedent: str | None):
+    """사건명(가중치 A) + 판례요지(가중치 B) n-gram 토큰으로 tsvector SQL 식을 만듦."""
+    return func.setweight(
+        func.to_tsvector("simple", search_document(case_name)), "A"
+    ).op("||")(
+        func.setweight(func.to_tsvector("simple", search_document(case_precedent)), "B")
+    )
+
+
+# ORM으로 저장/수정할 때마다 검색 벡터를 같이 갱신함 (크롤링, 단건 조회 저장 모두 해당)
+@event.listens_for(Judgement, "before_insert")
+@event.listens_for(Judgement, "before_update")
+def _refresh_search_vector(mapper, connection, target):
+    if connection.dialect.name != "postgresql":
+        return
+    target.search_vector = search_vector_expr(target.case_name, target.case_precedent)
\ No newline at end of file
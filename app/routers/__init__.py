@@ -1,8 +1,17 @@
 from fastapi import APIRouter
 from .crawl import router as crawl_router
 from .chatbot import router as chatbot_router
+from .rulings import router as rulings_router
+from .export import router as export_router
+from .citations import router as citations_router
+from .judgement import router as judgement_router
 
 router = APIRouter()
 
 router.include_router(crawl_router)
-router.include_router(chatbot_router)
\ No newline at end of file
+router.include_router(chatbot_router)
+# /api/v1/rulings/export 가 /api/v1/rulings/{case_number} 에 가려지지 않도록 먼저 등록
+router.include_router(export_router)
+router.include_router(rulings_router)
+router.include_router(citations_router)
+router.include_router(judgement_router)
\ No newline at end of file
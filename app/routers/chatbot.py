@@ -1,47 +1,166 @@
-from fastapi import APIRouter
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from typing import Optional
 from app.schemas.chat_bot import ChatRequest
 
-from app.services.chat_bot.models import make_response
+from app.services.chat_bot.batching import QueueFullError
+from app.services.chat_bot.answer_cache import CHAT_ANSWER_CACHE_ENABLED, answer_cache, cache_key
+from app.services.chat_bot.context import build_context
+from app.services.chat_bot.models import (
+    batching_stats, get_token_counter, make_response, prefix_cache_stats, stream_response,
+)
+from app.services.citations.graph import cited_context_rows
+from app.services.retrieval.service import retrieve
 from app.db import SessionLocal
+from app.utils.metrics import timed
 from app.models.model import Judgement
 
 router = APIRouter()
 
-@router.post("/chatbot/generate")
-def chat(request: ChatRequest):
-    # 키워드 받음 -> DB에서 그 단어가 들어간 판례를 일단 가져옴 -> AI 모델에 질문과 같이 던져줌 -> 답변 받아옴 -> 출력.
-    # 1. 단 db_should_query_this를 써서 DB에서 검색 돌림.
-    query = request.db_should_query_this
+def _retrieve(request: ChatRequest):
+    """(검색된 판례 목록, 답변 캐시 키) 를 반환."""
+    # 1. 단 db_should_query_this를 써서 DB에서 검색 돌림. (없으면 질문 자체로 검색)
+    query = request.db_should_query_this or request.user_question
     
     # 2. 데이터베이스 세션 시작
-    with SessionLocal() as db:  
-        # 사건명 또는 판례내용에서 검색어가 포함된 판례를 찾습니다.
-        cond = (Judgement.case_name.ilike(f"%{query}%")) | (Judgement.case_precedent.ilike(f"%{query}%"))
-        # 검색 결과를 10개로 제한합니다.
-        stmt = select(Judgement).where(cond).limit(10)
-        items = db.execute(stmt).scalars().all()
+    with SessionLocal() as db, timed("retrieval"):
+        # 의미(임베딩) 기반으로 가장 가까운 top_k 개 판례만 가져옵니다. (법원/사건종류/선고일 필터)
+        items = retrieve(
+            db, query, k=request.top_k, court=request.court, case_type=request.case_type,
+            date_from=request.date_from, date_to=request.date_to,
+        )
+        # 검색된 판례가 참조판례로 인용한 판례도 근거로 추가 (인용 간선 인덱스 조회 한 번)
+        cited = cited_context_rows(db, [item.id for item in items], request.cited_top_k)
         
     # 3. 검색 결과를 챗봇이 이해할 수 있는 형태로 변환함.
     results = [
         {
+            "id": str(item.id),
+            "updated_at": item.updated_at.isoformat() if item.updated_at else None,
             "title": item.case_name,
             "court": item.case_court,
             "date": item.case_date.isoformat() if item.case_date else None,
+            "case_number": item.case_number,
+            "decision": item.case_result_decision,
+            "summary": item.case_result_summary,
             "case_precedent": item.case_precedent
         } for item in items
+    ] + cited
+    return results, cache_key(request.user_question, request.model_type, results)
+
+def _build_context(request: ChatRequest, results):
+    if not results:
+        return results
+    # 4. 판례 전문 대신 질문과 관련 있는 발췌문만 토큰 예산 안에서 골라 넣음
+    count_tokens = get_token_counter(request.model_type)
+    with timed("context"):
+        return build_context(request.user_question, results, count_tokens)
+
+def _cacheable(request: ChatRequest) -> bool:
+    return CHAT_ANSWER_CACHE_ENABLED and request.model_type in ("huggingface", "gemini")
+
+def _citations(context):
+    return [
+        {"title": c["title"], "case_number": c["case_number"], "court": c["court"],
+         "date": c["date"], "passages": len(c["passages"]),
+         **({"cited_from": c["cited_from"]} if c.get("cited_from") else {})}
+        for c in context
     ]
-    print(results)
-    
+
+@router.post("/chatbot/generate")
+def chat(request: ChatRequest):
+    # 키워드 받음 -> DB에서 그 단어가 들어간 판례를 일단 가져옴 -> AI 모델에 질문과 같이 던져줌 -> 답변 받아옴 -> 출력.
+    results, key = _retrieve(request)
+
+    # 같은 질문 + 같은 근거 판례에 대한 답변이 캐시에 있으면 LLM 호출 생략
+    if _cacheable(request):
+        cached = answer_cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+    results = _build_context(request, results)
 
     # 최종 -> 변환된 결과, 사용자 질문을 함께 챗봇 모델에 전달.
-    response = make_response(
-        user_question=request.user_question, # 버그 수정 완료!
-        db_data=results, 
-        model_type=request.model_type
-    )
+    try:
+        response = make_response(
+            user_question=request.user_question, # 버그 수정 완료!
+            db_data=results, 
+            model_type=request.model_type
+        )
+    except QueueFullError as e:
+        # 배치 추론 대기열이 가득 참 -> 클라이언트가 잠시 후 재시도하도록 503
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     
-    return {"response": response}
\ No newline at end of file
+    body = {"response": response, "citations": _citations(results)}
+    if _cacheable(request):
+        answer_cache.set(key, body)
+    return {**body, "cached": False}
+
+# 허깅페이스 배치 추론 통계 (큐 길이, 평균 배치 크기, tokens/sec 등)
+@router.get("/chatbot/stats")
+def chat_stats():
+    return {
+        "hf_batching": batching_stats(),
+        "hf_prefix_cache": prefix_cache_stats(),
+        "answer_cache": answer_cache.stats(),
+    }
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# 스트리밍 버전 : 생성되는 토큰을 Server-Sent Events 로 바로 내보냄
+@router.post("/chatbot/generate/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    results, key = await run_in_threadpool(_retrieve, request)
+    cached = answer_cache.get(key) if _cacheable(request) else None
+    if cached is not None:
+        async def cached_events():
+            yield _sse({"token": cached["response"]})
+            yield _sse({"citations": cached["citations"], "cached": True}, event="done")
+
+        return StreamingResponse(cached_events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    results = await run_in_threadpool(_build_context, request, results)
+    try:
+        stream = await run_in_threadpool(
+            stream_response,
+            user_question=request.user_question,
+            db_data=results,
+            model_type=request.model_type,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        chunks = []
+        try:
+            # 토큰 대기는 블로킹이라 스레드풀에서 한 조각씩 꺼냄
+            async for chunk in iterate_in_threadpool(iter(stream)):
+                if await http_request.is_disconnected():
+                    break
+                chunks.append(chunk)
+                yield _sse({"token": chunk})
+            else:
+                citations = _citations(results)
+                # 끝까지 생성된 답변만 캐시 (중간에 끊긴 답변은 저장하지 않음)
+                if _cacheable(request) and not stream.cancelled.is_set():
+                    answer_cache.set(key, {"response": "".join(chunks), "citations": citations})
+                yield _sse({"citations": citations, "cached": False}, event="done")
+        except Exception as e:
+            yield _sse({"error": str(e)}, event="error")
+        finally:
+            # 클라이언트가 끊으면 모델 생성도 중단해서 연산 낭비를 막음
+            stream.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,71 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.services.citations import graph
+
+router = APIRouter(tags=["citations"])
+
+
+def _judgement_or_404(db: Session, case_number: str):
+    judgement = graph.find_judgement(db, case_number)
+    if judgement is None:
+        raise HTTPException(status_code=404, detail="해당 판례를 찾을 수 없습니다.")
+    return judgement
+
+
+# 이 판례가 참조판례로 인용한 판례
+@router.get("/api/v1/rulings/{case_number}/citing")
+def get_citing(
+    case_number: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    return graph.citing(db, _judgement_or_404(db, case_number), limit, offset)
+
+
+# 이 판례를 인용한 판례 (DB 에 없는 사건번호도 조회 가능)
+@router.get("/api/v1/rulings/{case_number}/cited-by")
+def get_cited_by(
+    case_number: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    return graph.cited_by(db, case_number, limit, offset)
+
+
+# 이 판례의 참조조문
+@router.get("/api/v1/rulings/{case_number}/statutes")
+def get_statutes(case_number: str, db: Session = Depends(get_db)):
+    return {"items": graph.statutes(db, _judgement_or_404(db, case_number))}
+
+
+# 인용 관계를 depth 단계까지 따라간 판례 (가까운 단계부터)
+@router.get("/api/v1/rulings/{case_number}/neighborhood")
+def get_neighborhood(
+    case_number: str,
+    depth: int = Query(2, ge=1, le=graph.CITATION_MAX_DEPTH),
+    direction: str = Query("both", pattern=f"^({'|'.join(graph.DIRECTIONS)})$"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    judgement = _judgement_or_404(db, case_number)
+    return graph.neighborhood(db, judgement, depth, direction, limit, offset)
+
+
+# 법령(조문) 을 참조조문으로 인용한 판례. 예) ?law=민법&article=제750조
+@router.get("/api/v1/statutes/cited-by")
+def get_statute_cited_by(
+    law: str = Query(..., description="법령명 (예: 민법)"),
+    article: Optional[str] = Query(None, description="조문 (예: 제750조, 제31조의2)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    article = article.replace(" ", "") if article else None
+    return graph.statute_cited_by(db, " ".join(law.split()), article, limit, offset)
@@ -1,28 +1,66 @@
+import asyncio
+import uuid
 
-from fastapi import APIRouter, Query
-from sqlalchemy.orm import Session
-from app.utils.crawl import fetch_law_data, save_law_data_to_db, law_data_list
+from fastapi import APIRouter, HTTPException, Query
+from app.schemas.crawl import CrawlJobRequest
+from app.services.crawler.jobs import create_job, get_job, job_to_dict, list_job_pages, runner
+from app.services.crawler.pipeline import CHANGE_LABELS, CrawlPipeline
+
+router = APIRouter()
 
 @router.post("/judgement")
-def get_judgement(header : str, page = int):
-    id_list = law_data_list(header, page)
-
-    results = []
-    count = 0
-    
-    for id in id_list:
-        data = fetch_law_data(str(id))
-        save_data = save_law_data_to_db(data)
-        
-        if save_data.get("saved"):
-            count += 1
-        
-        p = data.get("PrecService") if data else None
-        results.append({
-            "판례일련번호": id, 
-            "사건명": p.get("사건명") if p else None,
-            "저장상태": "성공" if save_data.get("saved") else "실패"
-        })
-    
-    results.append(f"{len(id_list)}건 중 {count}건 저장됨")
-    return results
\ No newline at end of file
+async def get_judgement(header : str, page: int = 1):
+    # 목록의 판례를 공유 커넥션 풀로 동시에 조회/저장 (동시성, 속도 제한, 재시도는 환경변수로 설정)
+    items = await CrawlPipeline().crawl_page(header, page)
+
+    results = [item.to_response() for item in items]
+    count = sum(1 for item in items if item.saved)
+    changes = {status: sum(1 for item in items if item.status == status) for status in CHANGE_LABELS}
+
+    # 재수집 시 내용이 같은 판례는 DB 에 쓰지 않음 (변경없음)
+    results.append(
+        f"{len(items)}건 중 {count}건 저장됨 "
+        f"(신규 {changes['inserted']}, 수정 {changes['updated']}, 변경없음 {changes['unchanged']})"
+    )
+    return results
+
+# 백그라운드 크롤링 작업 생성 : 페이지 단위로 체크포인트를 남기며 진행, 재시작 시 이어서 실행
+@router.post("/crawl/jobs", status_code=202)
+async def create_crawl_job(request: CrawlJobRequest):
+    if request.page_end is not None and request.page_end < request.page_start:
+        raise HTTPException(status_code=400, detail="page_end 는 page_start 보다 작을 수 없습니다.")
+    job = await asyncio.to_thread(create_job, request.keyword, request.page_start, request.page_end, request.resync)
+    runner.start(job.id)
+    return job_to_dict(job)
+
+# 작업 상태/진행률 조회
+@router.get("/crawl/jobs/{job_id}")
+async def get_crawl_job(job_id: uuid.UUID):
+    job = await asyncio.to_thread(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="해당 작업을 찾을 수 없습니다.")
+    return job_to_dict(job)
+
+# 페이지별 체크포인트 조회
+@router.get("/crawl/jobs/{job_id}/pages")
+async def get_crawl_job_pages(job_id: uuid.UUID):
+    pages = await asyncio.to_thread(list_job_pages, job_id)
+    return [
+        {"page": p.page, "ids": p.ids, "saved": p.saved, "failed": p.failed,
+         "skipped": p.skipped, "inserted": p.inserted, "updated": p.updated, "unchanged": p.unchanged,
+         "finished_at": p.finished_at}
+        for p in pages
+    ]
+
+@router.post("/crawl/jobs/{job_id}/cancel")
+async def cancel_crawl_job(job_id: uuid.UUID):
+    if not await runner.cancel(job_id):
+        raise HTTPException(status_code=409, detail="진행 중인 작업이 아닙니다.")
+    return {"id": job_id, "status": "cancelled"}
+
+# 실패/취소된 작업을 마지막 체크포인트부터 다시 실행
+@router.post("/crawl/jobs/{job_id}/resume")
+async def resume_crawl_job(job_id: uuid.UUID):
+    if not await runner.resume(job_id):
+        raise HTTPException(status_code=409, detail="재개할 수 있는 작업이 아닙니다.")
+    return {"id": job_id, "status": "pending"}
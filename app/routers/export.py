@@ -0,0 +1,26 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.transfer.export import iter_export
+
+router = APIRouter(prefix="/api/v1/rulings", tags=["rulings"])
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# 판례 대량 내보내기 : 서버 측 커서로 조금씩 읽어서 바로 흘려보냄 (테이블 크기와 무관하게 메모리 일정)
+@router.get("/export")
+def export_rulings(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    court: Optional[str] = Query(None, description="법원명"),
+    date_from: Optional[date] = Query(None, description="선고일 시작"),
+    date_to: Optional[date] = Query(None, description="선고일 끝"),
+):
+    chunks = iter_export(format, court=court, date_from=date_from, date_to=date_to)
+    return StreamingResponse(
+        chunks,
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="judgements.{format}"'},
+    )
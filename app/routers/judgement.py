@@ -1,45 +1,52 @@
 from fastapi import APIRouter, Query, Depends, HTTPException
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from app.utils.crawl import fetch_law_data
-from app.db import get_db
+from app.utils.cache import SingleFlight
+from app.utils.crawl import fetch_law_data, save_law_data_to_db
+from app.db import SessionLocal, get_db
 from app.models.model import Judgement
-import uuid
-from datetime import date
 
 router = APIRouter(prefix="/api/v1", tags=["judgement"])
 
+# 같은 id 로 동시에 들어온 DB 미스는 외부 조회 + 저장을 한 번만 함
+_fetch_flight = SingleFlight()
+
+def _find(db: Session, id: str):
+    # id 는 사건번호 또는 법령 API 판례일련번호
+    return db.query(Judgement).filter(or_(Judgement.case_number == id, Judgement.source_id == id)).first()
+
+def _fetch_and_save(id: str) -> dict:
+    # 기다리는 동안 다른 요청(다른 워커 포함)이 이미 저장했을 수 있음
+    with SessionLocal() as db:
+        obj = _find(db, id)
+        if obj is not None:
+            return {"saved": True, "status": "unchanged", "case_number": obj.case_number}
+    data = fetch_law_data(id)
+    if not data:
+        return {"saved": False, "reason": "해당 판례를 찾을 수 없습니다."}
+    # 사건번호+선고일자 기준 upsert 라 다른 워커와 동시에 저장해도 uq_case_num_date 충돌이 나지 않음.
+    # 상세/요약 캐시 무효화는 저장 콜백에서 처리됨.
+    return save_law_data_to_db(data, source_id=id if id.isdigit() else None)
+
 @router.get("/judgement")
 def get_or_fetch_judgement(id: str = Query(...), db: Session = Depends(get_db)):
-    # 1) DB에서 먼저 조회 (case_number 기준)
-    obj = db.query(Judgement).filter(Judgement.case_number == id).first()
+    # 1) DB에서 먼저 조회
+    obj = _find(db, id)
     if obj:
         return obj
 
-    # 2) 외부 API 호출
-    data = fetch_law_data(id)
-    if not data:
-        raise HTTPException(status_code=404, detail="해당 판례를 찾을 수 없습니다.")
+    # 2) 외부 API 호출 + DB 저장 (동시 요청은 결과를 공유)
+    result = _fetch_flight.do(id, lambda: _fetch_and_save(id))
+    if not result["saved"]:
+        raise HTTPException(status_code=404, detail=result["reason"])
 
-    # 3) DB 저장
-    new_case = Judgement(
-        id=str(uuid.uuid4()),
-        case_number=data["case_number"],
-        case_name=data["case_name"],
-        case_date=date.fromisoformat(data["case_date"]),  # 문자열 → date 변환
-        case_result=data["case_result"],
-        case_court=data["case_court"],
-        case_court_code=data.get("case_court_code"),
-        case_type=data.get("case_type"),
-        case_type_code=data.get("case_type_code"),
-        case_result_type=data.get("case_result_type"),
-        case_result_decision=data.get("case_result_decision"),
-        case_result_summary=data.get("case_result_summary"),
-        reference=data.get("reference"),
-        reference_case=data.get("reference_case"),
-        case_precedent=data.get("case_precedent"),
-    )
-    db.add(new_case)
-    db.commit()
-    db.refresh(new_case)
-    return new_case
+    # 3) 저장된 판례 반환
+    obj = _find(db, result["case_number"])
+    if obj is None:
+        raise HTTPException(status_code=404, detail="해당 판례를 찾을 수 없습니다.")
+    return obj
 
+# 외부 조회 합치기 통계 (실제 조회 수, 다른 요청의 결과를 같이 받은 수)
+@router.get("/judgement/stats")
+def judgement_stats():
+    return _fetch_flight.stats()
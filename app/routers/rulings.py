@@ -1,42 +1,80 @@
 # FastAPI의 APIRouter와 에러 처리를 위한 HTTPException을 가져옵니다.
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
 from app.models.model import Judgement
+from app.schemas.rulings import RulingBatchRequest
+from app.services.rulings.cache import is_not_modified, make_entry, ruling_cache
+
+# 한 번에 조회할 수 있는 최대 사건번호 수
+RULING_BATCH_MAX = int(os.getenv("RULING_BATCH_MAX", "100"))
 
 # APIRouter 객체를 생성합니다. Flask의 Blueprint와 비슷한 역할을 합니다.
 # prefix는 이 라우터에 속한 모든 API의 기본 경로를 의미합니다.
 router = APIRouter(prefix="/api/v1/rulings")
 
-# 상세보기 : 사건번호로 판례 조회
-@router.get("/{case_number}")
-def get_ruling_detail(case_number: str, db: Session = Depends(get_db)):
-    obj = db.query(Judgement).filter(Judgement.case_number == case_number).first()
-    if not obj:
-        raise HTTPException(status_code=404, detail="해당 판례를 찾을 수 없습니다.")
+async def _load_entry(case_number: str, db: AsyncSession, not_found: str):
+    # 캐시에 있으면 DB를 조회하지 않음 (Session 은 실제 쿼리 전까지 커넥션을 잡지 않음)
+    entry = await ruling_cache.aget(case_number)
+    if entry is None:
+        stmt = select(Judgement).where(Judgement.case_number == case_number).limit(1)
+        obj = (await db.execute(stmt)).scalars().first()
+        if not obj:
+            raise HTTPException(status_code=404, detail=not_found)
+        entry = make_entry(obj)
+        await ruling_cache.aset(case_number, entry)
+    return entry
+
+def _respond(entry, content, if_none_match, if_modified_since):
+    headers = {"ETag": entry["etag"], "Last-Modified": entry["last_modified"], "Cache-Control": "no-cache"}
+    if is_not_modified(entry, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
+
+# 목록 화면용 일괄 조회 : 여러 사건번호를 캐시 + IN 쿼리 한 번으로 조회 (요청 순서대로, 없는 것은 missing)
+@router.post("/batch")
+async def get_rulings_batch(request: RulingBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    case_numbers = list(dict.fromkeys(request.case_numbers))
+    if len(case_numbers) > RULING_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"사건번호는 한 번에 최대 {RULING_BATCH_MAX}개까지 조회할 수 있습니다.")
+    entries = await ruling_cache.aget_many(case_numbers)
+    misses = [c for c in case_numbers if c not in entries]
+    if misses:
+        stmt = select(Judgement).where(Judgement.case_number.in_(misses))
+        loaded = {}
+        for obj in (await db.execute(stmt)).scalars():
+            if obj.case_number not in loaded:
+                loaded[obj.case_number] = make_entry(obj)
+        await ruling_cache.aset_many(loaded)
+        entries.update(loaded)
     return {
-        "id": obj.id,
-        "case_number": obj.case_number,
-        "case_name": obj.case_name,
-        "case_date": obj.case_date,
-        "case_result": obj.case_result,
-        "case_court": obj.case_court,
-        "case_court_code": obj.case_court_code,
-        "case_type": obj.case_type,
-        "case_type_code": obj.case_type_code,
-        "case_result_type": obj.case_result_type,
-        "case_result_decision": obj.case_result_decision,
-        "case_result_summary": obj.case_result_summary,
-        "reference": obj.reference,
-        "reference_case": obj.reference_case,
-        "case_precedent": obj.case_precedent,
+        "items": [entries[c]["data"] for c in case_numbers if c in entries],
+        "missing": [c for c in case_numbers if c not in entries],
     }
 
+# 상세보기 : 사건번호로 판례 조회
+@router.get("/{case_number}")
+async def get_ruling_detail(
+    case_number: str,
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    entry = await _load_entry(case_number, db, "해당 판례를 찾을 수 없습니다.")
+    return _respond(entry, entry["data"], if_none_match, if_modified_since)
+
 # 요약보기 : 사건번호로 판례 요약 조회
 @router.get("/{case_number}/summary")
-def get_ruling_summary(case_number: str, db: Session = Depends(get_db)):
-    obj = db.query(Judgement).filter(Judgement.case_number == case_number).first()
-    if not obj:
-        raise HTTPException(status_code=404, detail="해당 사건번호를 찾을 수 없습니다.")
-    return {"id": obj.id, "summary": obj.case_result_summary}
-
+async def get_ruling_summary(
+    case_number: str,
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    entry = await _load_entry(case_number, db, "해당 사건번호를 찾을 수 없습니다.")
+    data = entry["data"]
+    return _respond(entry, {"id": data["id"], "summary": data["case_result_summary"]}, if_none_match, if_modified_since)
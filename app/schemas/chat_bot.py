@@ -1,10 +1,23 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 from typing import Optional
+from datetime import date
 
 class ChatRequest(BaseModel):
     user_question: str  # 유저 질문
     db_should_query_this: str = ""  # DB 검색 키워드
-    model_type: str = ""  # 모델 타입
\ No newline at end of file
+    model_type: str = ""  # 모델 타입
+    top_k: int = Field(5, ge=1, le=20)  # 컨텍스트로 넘길 판례 수
+    court: Optional[str] = Field(None, max_length=50)  # 법원명 필터
+    case_type: Optional[str] = Field(None, max_length=50)  # 사건종류 필터
+    date_from: Optional[date] = None  # 선고일 시작
+    date_to: Optional[date] = None  # 선고일 끝
+    cited_top_k: int = Field(0, ge=0, le=10)  # 검색된 판례가 인용한 판례를 추가로 넘길 수 (판시사항/판결요지만)
+
+    @model_validator(mode="after")
+    def _check_date_range(self):
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValueError("date_from 은 date_to 보다 늦을 수 없습니다.")
+        return self
@@ -0,0 +1,8 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class CrawlJobRequest(BaseModel):
+    keyword: str  # 검색 키워드
+    page_start: int = Field(1, ge=1)  # 시작 페이지
+    page_end: Optional[int] = Field(None, ge=1)  # 끝 페이지 (없으면 빈 페이지가 나올 때까지)
+    resync: bool = False  # True 면 이미 보유한 판례도 다시 조회
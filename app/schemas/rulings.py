@@ -0,0 +1,5 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class RulingBatchRequest(BaseModel):
+    case_numbers: List[str] = Field(..., min_length=1)  # 조회할 사건번호 목록 (순서대로 응답)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.services.search.tokenizer import normalize
+from app.utils.cache import TTLCache
+
+load_dotenv()
+
+# 챗봇 답변 캐시. 같은 질문 + 같은 모델 + 같은 근거 판례(버전 포함)면 LLM 호출 없이 재사용.
+CHAT_ANSWER_CACHE_ENABLED = os.getenv("CHAT_ANSWER_CACHE_ENABLED", "1") == "1"
+CHAT_ANSWER_CACHE_SIZE = int(os.getenv("CHAT_ANSWER_CACHE_SIZE", "1024"))
+CHAT_ANSWER_CACHE_TTL = float(os.getenv("CHAT_ANSWER_CACHE_TTL", "86400"))
+# 설정하면 재시작 후에도 유지되도록 sqlite 파일에 저장 (예: /app/data/answer_cache.db)
+CHAT_ANSWER_CACHE_PATH = os.getenv("CHAT_ANSWER_CACHE_PATH")
+
+
+def cache_key(user_question: str, model_type: str, evidence: List[Dict]) -> str:
+    """정규화한 질문 + 모델 + 근거 판례 (id, updated_at) 집합으로 키를 만듦.
+
+    판례가 수정되면 updated_at 이 바뀌어 키가 달라지므로, 예전 답변은 자연히 무효화됨.
+    """
+    versions = sorted(f"{e.get('id')}@{e.get('updated_at')}" for e in evidence)
+    raw = json.dumps([normalize(user_question), model_type, versions], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class _SqliteStore:
+    def __init__(self, path: str, ttl: float, maxsize: int):
+        self.path = path
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM answers WHERE key = ? AND created_at > ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+            # 만료된 것 + 한도를 넘는 오래된 것 정리
+            self._conn.execute("DELETE FROM answers WHERE created_at <= ?", (time.time() - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+
+
+class AnswerCache:
+    def __init__(self, maxsize: int = CHAT_ANSWER_CACHE_SIZE, ttl: float = CHAT_ANSWER_CACHE_TTL,
+                 path: Optional[str] = CHAT_ANSWER_CACHE_PATH):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.store = _SqliteStore(path, ttl, maxsize * 10) if path else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.memory.get(key)
+        if value is None and self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict) -> None:
+        self.memory.set(key, value)
+        if self.store is not None:
+            try:
+                self.store.set(key, value)
+            except sqlite3.Error as e:
+                print(f"⚠️  답변 캐시 저장 실패: {e}")
+        with self._lock:
+            self.stores += 1
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": CHAT_ANSWER_CACHE_ENABLED,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "stores": self.stores,
+            "saved_generations": self.hits,  # 캐시 적중 = 아낀 GPU/API 호출 수
+            "size": len(self.memory),
+            "persistent": self.store is not None,
+        }
+
+
+answer_cache = AnswerCache()
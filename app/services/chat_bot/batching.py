@@ -0,0 +1,199 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .timing import GenerationTimer, with_timer
+
+load_dotenv()
+
+# 허깅페이스 배치 추론 설정
+HF_BATCH_MAX_SIZE = int(os.getenv("HF_BATCH_MAX_SIZE", "8"))          # 한 번에 묶을 최대 요청 수
+HF_BATCH_MAX_WAIT_MS = float(os.getenv("HF_BATCH_MAX_WAIT_MS", "20"))  # 첫 요청 이후 다른 요청을 기다리는 시간
+HF_BATCH_MAX_QUEUE = int(os.getenv("HF_BATCH_MAX_QUEUE", "64"))        # 대기열 한도 (넘으면 거절)
+
+
+class QueueFullError(RuntimeError):
+    """대기 중인 요청이 너무 많아서 새 요청을 받을 수 없음."""
+
+
+@dataclass
+class _Request:
+    input_ids: List[int]
+    max_new_tokens: int
+    temperature: float
+    prefix_key: Optional[str] = None  # 시스템 프롬프트 (prefix KV 캐시 키)
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def group_key(self):
+        # 같은 generate 호출로 묶을 수 있는 요청끼리만 배치 (샘플링 설정이 같아야 함)
+        return self.temperature
+
+
+class BatchingEngine:
+    """요청을 큐에 모았다가 짧은 시간 창 안에 들어온 것들을 패딩해서 한 번의 generate 로 처리.
+
+    model / tokenizer 는 transformers 의 CausalLM / Tokenizer 면 되므로 작은 CPU 모델로도 테스트 가능.
+    """
+
+    def __init__(self, model, tokenizer, max_batch_size: int = HF_BATCH_MAX_SIZE,
+                 max_wait_ms: float = HF_BATCH_MAX_WAIT_MS, max_queue: int = HF_BATCH_MAX_QUEUE,
+                 prefix_cache=None, generate_lock: Optional[threading.Lock] = None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prefix_cache = prefix_cache
+        # 같은 모델로 배치 밖에서 generate 하는 쪽(스트리밍 등)과 공유하면 동시에 돌지 않음
+        self._generate_lock = generate_lock or threading.Lock()
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        self.eos_token_id = tokenizer.eos_token_id
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._held: List[_Request] = []  # 이전 배치에 못 들어간(설정이 다른) 요청
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0, "rejected": 0, "batches": 0, "batched_requests": 0,
+            "generated_tokens": 0, "generate_seconds": 0.0, "queue_wait_seconds": 0.0,
+            "max_batch_size_seen": 0,
+        }
+        self._thread = threading.Thread(target=self._loop, name="hf-batching", daemon=True)
+        self._thread.start()
+
+    # ---------- 외부 API ----------
+    def submit(self, input_ids: List[int], max_new_tokens: int, temperature: float,
+               prefix_key: Optional[str] = None) -> Future:
+        """프롬프트 토큰을 큐에 넣고, 생성된 전체 텍스트로 완료되는 Future 를 반환."""
+        if self.queue_depth >= self.max_queue:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise QueueFullError("추론 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+        request = _Request(list(input_ids), max_new_tokens, temperature, prefix_key)
+        with self._stats_lock:
+            self._stats["requests"] += 1
+        self._queue.put(request)
+        return request.future
+
+    def generate(self, input_ids: List[int], max_new_tokens: int, temperature: float,
+                 prefix_key: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        return self.submit(input_ids, max_new_tokens, temperature, prefix_key).result(timeout=timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() + len(self._held)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            s = dict(self._stats)
+        s["queue_depth"] = self.queue_depth
+        s["avg_batch_size"] = round(s["batched_requests"] / s["batches"], 3) if s["batches"] else 0.0
+        s["tokens_per_second"] = round(s["generated_tokens"] / s["generate_seconds"], 2) if s["generate_seconds"] else 0.0
+        s["avg_queue_wait_ms"] = round(1000 * s["queue_wait_seconds"] / s["batched_requests"], 2) if s["batched_requests"] else 0.0
+        s["max_batch_size"] = self.max_batch_size
+        s["max_wait_ms"] = self.max_wait * 1000
+        s["max_queue"] = self.max_queue
+        return s
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    # ---------- 배치 처리 ----------
+    def _next_request(self, timeout: Optional[float]) -> Optional[_Request]:
+        if self._held:
+            return self._held.pop(0)
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _collect(self) -> List[_Request]:
+        first = self._next_request(timeout=0.1)
+        if first is None:
+            return []
+        batch = [first]
+        deferred = []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and not self._held:
+                break
+            request = self._next_request(timeout=max(remaining, 0))
+            if request is None:
+                break
+            if request.group_key == first.group_key:
+                batch.append(request)
+            else:
+                deferred.append(request)
+        self._held = deferred + self._held
+        return batch
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            batch = [r for r in self._collect() if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                for r in batch:
+                    if not r.future.done():
+                        r.future.set_exception(e)
+
+    def _run_batch(self, batch: List[_Request]) -> None:
+        import torch
+
+        started = time.monotonic()
+        # 디코더 전용 모델이므로 왼쪽 패딩 (생성 위치가 모든 행에서 같아야 함)
+        width = max(len(r.input_ids) for r in batch)
+        input_ids = torch.full((len(batch), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), width), dtype=torch.long)
+        for i, r in enumerate(batch):
+            input_ids[i, width - len(r.input_ids):] = torch.tensor(r.input_ids, dtype=torch.long)
+            attention_mask[i, width - len(r.input_ids):] = 1
+
+        max_new_tokens = max(r.max_new_tokens for r in batch)
+        generate_kwargs = dict(
+            attention_mask=attention_mask.to(self.model.device),
+            max_new_tokens=max_new_tokens,
+            temperature=batch[0].temperature,
+            do_sample=True,
+            pad_token_id=self.pad_token_id,
+        )
+        timer = GenerationTimer()
+        generate_kwargs = with_timer(generate_kwargs, timer)
+        with self._generate_lock, torch.inference_mode():
+            if len(batch) == 1 and self.prefix_cache is not None and batch[0].prefix_key is not None:
+                # 단독 요청은 패딩이 없으므로 시스템 프롬프트 KV 캐시를 재사용
+                output = self.prefix_cache.generate(
+                    batch[0].prefix_key, input_ids.to(self.model.device), **generate_kwargs
+                )
+            else:
+                output = self.model.generate(input_ids=input_ids.to(self.model.device), **generate_kwargs)
+        elapsed = time.monotonic() - started
+
+        generated = 0
+        for i, r in enumerate(batch):
+            new_tokens = output[i, width:].tolist()[:r.max_new_tokens]
+            if self.eos_token_id is not None and self.eos_token_id in new_tokens:
+                new_tokens = new_tokens[:new_tokens.index(self.eos_token_id) + 1]
+            generated += len(new_tokens)
+            # 기존 make_response 와 같은 형식 (프롬프트 + 생성 결과 전체를 디코딩)
+            r.future.set_result(self.tokenizer.decode(r.input_ids + new_tokens, skip_special_tokens=True))
+        timer.finish(generated, len(batch))
+
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["batched_requests"] += len(batch)
+            self._stats["generated_tokens"] += generated
+            self._stats["generate_seconds"] += elapsed
+            self._stats["queue_wait_seconds"] += sum(started - r.enqueued_at for r in batch)
+            self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], len(batch))
@@ -0,0 +1,127 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.services.search.tokenizer import ngrams, query_terms
+
+load_dotenv()
+
+# 프롬프트에 넣을 판례 컨텍스트의 토큰 예산 (질문/시스템 프롬프트 제외)
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1500"))
+PASSAGE_MAX_CHARS = int(os.getenv("CHAT_PASSAGE_MAX_CHARS", "400"))
+# 사용하지 않는 판례라도 최소 1개 발췌는 넣을지 (근거 다양성)
+MIN_PASSAGES_PER_CASE = int(os.getenv("CHAT_MIN_PASSAGES_PER_CASE", "0"))
+
+# 판례 데이터에서 발췌 후보로 쓰는 필드 (앞쪽일수록 요약도가 높아 가산점)
+PASSAGE_FIELDS = (("decision", 1.3), ("summary", 1.2), ("case_precedent", 1.0))
+
+_SENTENCE_END = re.compile(r"(?<=[다요함음됨\.\?!])\s+|\n+")
+
+
+def split_passages(text: Optional[str], max_chars: int = PASSAGE_MAX_CHARS) -> List[str]:
+    """문장 경계 기준으로 max_chars 이하의 발췌문으로 나눔."""
+    if not text:
+        return []
+    passages, current = [], ""
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:  # 문장 하나가 너무 길면 강제로 자름
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            passages.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        passages.append(current)
+    return passages
+
+
+def citation_line(item: Dict) -> str:
+    line = (
+        f"사건명: {item.get('title')}, 사건번호: {item.get('case_number')}, "
+        f"법원: {item.get('court')}, 선고일: {item.get('date')}"
+    )
+    if item.get("cited_from"):
+        line += f" ({item['cited_from']} 이 인용)"
+    return line
+
+
+def build_context(
+    user_question: str,
+    db_data: List[Dict],
+    count_tokens: Callable[[str], int],
+    token_budget: int = CHAT_CONTEXT_TOKEN_BUDGET,
+) -> List[Dict]:
+    """판례들을 발췌문으로 쪼개서 질문과의 관련도 순으로 토큰 예산 안에 채워 넣음.
+
+    반환값은 사용된 판례만 원래 순서대로, 각자 고른 발췌문("passages")과 출처 정보를 포함.
+    """
+    candidates = []  # (score, case_idx, order, text)
+    for case_idx, item in enumerate(db_data):
+        order = 0
+        for field, weight in PASSAGE_FIELDS:
+            for passage in split_passages(item.get(field)):
+                candidates.append([weight, case_idx, order, passage])
+                order += 1
+
+    # 질문 n-gram 기준 BM25 비슷한 점수 (발췌문 집합 안에서 idf 계산)
+    terms = query_terms(user_question)
+    tfs = [Counter(ngrams(c[3])) for c in candidates]
+    n = len(candidates)
+    idf = {}
+    for term in terms:
+        df = sum(1 for tf in tfs if tf[term])
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    for cand, tf in zip(candidates, tfs):
+        cand[0] *= sum(idf[t] * tf[t] / (tf[t] + 1.2) for t in terms if tf[t])
+
+    selected: Dict[int, List] = {}
+    used = 0
+
+    def take(cand) -> bool:
+        nonlocal used
+        cost = count_tokens(cand[3])
+        if cand[1] not in selected:
+            cost += count_tokens(citation_line(db_data[cand[1]]))
+        if used + cost > token_budget:
+            return False
+        used += cost
+        selected.setdefault(cand[1], []).append(cand)
+        return True
+
+    ranked = sorted(candidates, key=lambda c: (-c[0], c[1], c[2]))
+    if MIN_PASSAGES_PER_CASE:
+        for case_idx in range(len(db_data)):
+            for cand in [c for c in ranked if c[1] == case_idx][:MIN_PASSAGES_PER_CASE]:
+                take(cand)
+    for cand in ranked:
+        if cand[0] <= 0 and selected:
+            break  # 질문과 전혀 관련 없는 발췌문은 넣지 않음 (아무것도 없을 때만 예외)
+        if any(cand is c for c in selected.get(cand[1], [])):
+            continue
+        take(cand)
+
+    context = []
+    for case_idx in sorted(selected):
+        item = db_data[case_idx]
+        passages = [c[3] for c in sorted(selected[case_idx], key=lambda c: c[2])]
+        context.append({
+            "title": item.get("title"),
+            "case_number": item.get("case_number"),
+            "court": item.get("court"),
+            "date": item.get("date"),
+            "passages": passages,
+            **({"cited_from": item["cited_from"]} if item.get("cited_from") else {}),
+        })
+    return context
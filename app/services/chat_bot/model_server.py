@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+from typing import Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from .batching import QueueFullError
+
+load_dotenv()
+
+# 허깅페이스 모델을 소유하는 별도 추론 프로세스의 Unix 소켓 경로.
+# 설정하면 API 워커들은 모델을 직접 로드하지 않고 이 소켓으로 생성 요청만 보냄.
+MODEL_SERVER_SOCKET = os.getenv("MODEL_SERVER_SOCKET")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", "600"))
+
+# 클라이언트가 넘길 수 있는 생성 인자
+_GENERATE_ARGS = ("user_question", "db_data", "system_prompt", "max_new_tokens", "temperature")
+
+
+class ModelServerError(RuntimeError):
+    """추론 서버가 오류를 반환했거나 연결할 수 없음."""
+
+
+# ---------- 클라이언트 (API 워커 쪽) ----------
+class ModelServerClient:
+    """요청마다 Unix 소켓 연결 하나를 열고 줄 단위 JSON 으로 주고받는 동기 클라이언트."""
+
+    def __init__(self, socket_path: str, timeout: float = MODEL_SERVER_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connect(self, payload: Dict):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode() + b"\n")
+        except OSError as e:
+            sock.close()
+            raise ModelServerError(f"추론 서버에 연결할 수 없습니다: {e}") from e
+        return sock
+
+    @staticmethod
+    def _check(message: Dict) -> Dict:
+        if message.get("ok", True):
+            return message
+        if message.get("error") == "queue_full":
+            raise QueueFullError(message.get("detail"))
+        raise ModelServerError(message.get("detail") or message.get("error"))
+
+    def _call(self, payload: Dict) -> Dict:
+        sock = self._connect(payload)
+        try:
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        finally:
+            sock.close()
+        if not line:
+            raise ModelServerError("추론 서버가 응답 없이 연결을 닫았습니다.")
+        return self._check(json.loads(line))
+
+    def generate(self, **kwargs) -> str:
+        return self._call({"op": "generate", **kwargs})["text"]
+
+    def stream(self, **kwargs) -> "RemoteTokenStream":
+        return RemoteTokenStream(self._connect({"op": "stream", **kwargs}), self._check)
+
+    def stats(self) -> Dict:
+        return self._call({"op": "stats"})
+
+    def readiness(self) -> Dict:
+        return self._call({"op": "ready"})
+
+
+class RemoteTokenStream:
+    """TokenStream 과 같은 인터페이스. cancel() 하면 소켓을 닫고, 서버는 이를 감지해서 생성을 멈춤."""
+
+    def __init__(self, sock: socket.socket, check):
+        self._sock = sock
+        self._file = sock.makefile("rb")
+        self._check = check
+        self.cancelled = threading.Event()
+
+    def __iter__(self) -> Iterator[str]:
+        finished = False
+        try:
+            for line in self._file:
+                if self.cancelled.is_set():
+                    break
+                message = self._check(json.loads(line))
+                if message.get("done"):
+                    finished = True
+                    break
+                yield message["token"]
+        finally:
+            if finished:
+                self._close()
+            else:
+                self.cancel()
+
+    def _close(self) -> None:
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._file.close()
+        self._sock.close()
+
+    def cancel(self) -> None:
+        if not self.cancelled.is_set():
+            self.cancelled.set()
+            self._close()
+
+
+_client: Optional[ModelServerClient] = None
+_serving = False  # 추론 서버 프로세스 자신은 클라이언트 모드를 쓰지 않음
+
+
+def get_model_client() -> Optional[ModelServerClient]:
+    """MODEL_SERVER_SOCKET 이 설정된 API 워커면 클라이언트, 아니면 None (모델을 직접 로드)."""
+    global _client
+    if not MODEL_SERVER_SOCKET or _serving:
+        return None
+    if _client is None:
+        _client = ModelServerClient(MODEL_SERVER_SOCKET)
+    return _client
+
+
+# ---------- 서버 (추론 프로세스 쪽) ----------
+async def _send(writer: asyncio.StreamWriter, message: Dict) -> None:
+    writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+    await writer.drain()
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    from . import models
+
+    try:
+        line = await reader.readline()
+        if not line:
+            return
+        request = json.loads(line)
+        op = request.get("op")
+        kwargs = {k: request[k] for k in _GENERATE_ARGS if k in request}
+        if op == "generate":
+            text = await asyncio.to_thread(models.make_response_local, model_type="huggingface", **kwargs)
+            await _send(writer, {"ok": True, "text": text})
+        elif op == "stream":
+            stream = await asyncio.to_thread(models.stream_response_local, model_type="huggingface", **kwargs)
+            # 클라이언트가 연결을 끊으면 read 가 끝나므로 이를 취소 신호로 사용
+            disconnected = asyncio.ensure_future(reader.read(1))
+            tokens = iter(stream)
+            try:
+                while not disconnected.done():
+                    try:
+                        chunk = await asyncio.to_thread(next, tokens, None)
+                    except Exception as e:
+                        # 생성 실패를 done 으로 보내면 클라이언트가 잘린 답변을 완료로 받아 캐시함
+                        await _send(writer, {"ok": False, "error": "internal", "detail": str(e)})
+                        break
+                    if chunk is None:
+                        await _send(writer, {"done": True})
+                        break
+                    await _send(writer, {"token": chunk})
+            finally:
+                stream.cancel()
+                disconnected.cancel()
+        elif op == "stats":
+            # 통계 수집이 락을 잡을 수 있으므로 이벤트 루프 밖에서
+            batching, prefix = await asyncio.to_thread(
+                lambda: (models.batching_stats(), models.prefix_cache_stats())
+            )
+            await _send(writer, {"ok": True, "hf_batching": batching, "hf_prefix_cache": prefix})
+        elif op == "ready":
+            state = await asyncio.to_thread(lambda: dict(models.backend_state["huggingface"]))
+            await _send(writer, {"ok": True, **state})
+        else:
+            await _send(writer, {"ok": False, "error": "bad_request", "detail": f"unknown op: {op}"})
+    except QueueFullError as e:
+        await _send(writer, {"ok": False, "error": "queue_full", "detail": str(e)})
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except Exception as e:
+        try:
+            await _send(writer, {"ok": False, "error": "internal", "detail": str(e)})
+        except ConnectionError:
+            pass
+    finally:
+        writer.close()
+
+
+def _mark_serving() -> None:
+    # python -m 으로 실행하면 이 파일은 __main__ 으로 한 번, models.py 가 import 하는
+    # app.services.chat_bot.model_server 로 또 한 번 로드됨. get_model_client() 가 보는 쪽은 후자.
+    global _serving
+    from app.services.chat_bot import model_server
+
+    _serving = True
+    model_server._serving = True
+
+
+async def serve(socket_path: str) -> None:
+    _mark_serving()
+    from . import models
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # 소켓을 먼저 열고 모델은 백그라운드에서 로드 (그동안 ready 요청에는 loading 으로 응답)
+    server = await asyncio.start_unix_server(_handle, path=socket_path, limit=16 * 1024 * 1024)
+    os.chmod(socket_path, 0o660)
+    print(f"✅ 추론 서버 대기 중: {socket_path}")
+    asyncio.get_running_loop().run_in_executor(
+        None, models.warm_up, ["huggingface"], models.MODEL_WARMUP_GENERATE
+    )
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    # python -m app.services.chat_bot.model_server  (MODEL_SERVER_SOCKET 경로에서 대기)
+    asyncio.run(serve(MODEL_SERVER_SOCKET or "/tmp/law-model.sock"))
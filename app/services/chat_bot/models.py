@@ -1,24 +1,87 @@
-from typing import List, Dict, Optional
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from google import generativeai as genai
+import logging
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Optional
 from dotenv import load_dotenv
 import os
 
+from .batching import BatchingEngine
+from .context import citation_line
+from .model_server import get_model_client
+from .prefix_cache import HF_PREFIX_CACHE, PrefixCache
+from .timing import GenerationTimer, with_timer
+from app.utils.metrics import LLM_GENERATED_TOKENS, observe_stage, timed
+
+# transformers / google.generativeai 는 import 비용이 커서 실제로 모델을 쓸 때만 불러옴.
+# (검색/상세 조회만 하는 워커는 ML 스택을 아예 로드하지 않음)
+if TYPE_CHECKING:
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    from google.generativeai import GenerativeModel
+
 load_dotenv()
 
+# 1 이면 허깅페이스 요청을 짧은 시간 창 안에서 모아 배치로 생성 (동시 사용자 처리량 향상)
+HF_BATCHING = os.getenv("HF_BATCHING", "1") == "1"
+hf_batching_engine: Optional[BatchingEngine] = None
+hf_prefix_cache: Optional[PrefixCache] = None
+
 # 허깅페이스, 제미나이 모델에 대한 변수 설정.
-HF_MODEL_NAME = "openai/gpt-oss-20b"
-hf_tokenizer: Optional[AutoTokenizer] = None
-hf_model: Optional[AutoModelForCausalLM] = None
+HF_MODEL_NAME = os.getenv("HF_MODEL_NAME", "openai/gpt-oss-20b")  # 벤치마크/개발 시 작은 모델로 교체 가능
+hf_tokenizer: Optional["AutoTokenizer"] = None
+hf_model: Optional["AutoModelForCausalLM"] = None
 
 GEMINI_MODEL_NAME = "gemini-2.5-flash"
-gemini_client: Optional[genai.GenerativeModel] = None
+GEMINI_CHARS_PER_TOKEN = float(os.getenv("GEMINI_CHARS_PER_TOKEN", "1.5"))  # 한국어 기준 대략치
+gemini_client: Optional["GenerativeModel"] = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYSTEM_PROMPT = "당신은 법률 전문가이며, 오직 다음의 판례 데이터만을 참고하여 사용자 질문에 답변해야 합니다. 제공된 데이터에 없는 내용은 답변할 수 없습니다."
+
+# 시작 시 미리 로드할 백엔드 (예: "huggingface,gemini"). 비어 있으면 첫 요청 때 로드.
+MODEL_PRELOAD = [b.strip() for b in os.getenv("MODEL_PRELOAD", "").split(",") if b.strip()]
+# 1 이면 로드 후 짧은 더미 생성까지 실행 (커널/캐시 워밍업)
+MODEL_WARMUP_GENERATE = os.getenv("MODEL_WARMUP_GENERATE", "1") == "1"
+
+# 백엔드별 로드 상태 (readiness 확인용). status: not_loaded / loading / ready / failed
+backend_state: Dict[str, Dict] = {
+    name: {"status": "not_loaded", "warmed_up": False, "load_seconds": None, "error": None}
+    for name in ("huggingface", "gemini")
+}
+_load_locks = {name: threading.Lock() for name in backend_state}
+# 배치 엔진/prefix 캐시를 한 번만 만들기 위한 락 (_get_batching_engine 안에서 _get_prefix_cache 를 부르므로 RLock)
+_hf_init_lock = threading.RLock()
+# 허깅페이스 모델의 generate 는 한 번에 하나만 (배치 워커, 스트리밍, 비배치 생성, 워밍업 공용)
+_hf_generate_lock = threading.Lock()
+
+
+def _genai():
+    from google import generativeai as genai
+    return genai
+
+
+def _track_load(name: str, load) -> None:
+    # 동시에 여러 요청이 들어와도 모델은 한 번만 로드
+    with _load_locks[name]:
+        if backend_state[name]["status"] == "ready":
+            return
+        backend_state[name].update(status="loading", error=None)
+        started = time.monotonic()
+        try:
+            load()
+        except Exception as e:
+            backend_state[name].update(status="failed", error=str(e))
+            raise
+        backend_state[name].update(status="ready", load_seconds=round(time.monotonic() - started, 3))
 
 
 # 허깅페이스 모델(OPENAI) 로드
 def _load_hf_model() -> None:
-    global hf_tokenizer, hf_model
-    if hf_tokenizer is None or hf_model is None:
+    def load():
+        global hf_tokenizer, hf_model
+        from transformers import AutoTokenizer, AutoModelForCausalLM
+
         hf_tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_NAME)
         hf_model = AutoModelForCausalLM.from_pretrained(
             HF_MODEL_NAME,
@@ -26,39 +89,207 @@ def _load_hf_model() -> None:
             device_map="auto"
         )
 
+    if hf_tokenizer is None or hf_model is None:
+        _track_load("huggingface", load)
+
+def _load_hf_tokenizer() -> None:
+    # 추론 서버를 쓰는 워커는 토큰 수 계산용 토크나이저만 로드 (가중치 없음)
+    global hf_tokenizer
+    if hf_tokenizer is None:
+        from transformers import AutoTokenizer
+
+        hf_tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_NAME)
+
+def _get_prefix_cache() -> Optional[PrefixCache]:
+    global hf_prefix_cache
+    if HF_PREFIX_CACHE and hf_prefix_cache is None:
+        _load_hf_model()
+        with _hf_init_lock:
+            if hf_prefix_cache is None:
+                hf_prefix_cache = PrefixCache(hf_model, hf_tokenizer)
+    return hf_prefix_cache
+
+def _get_batching_engine() -> BatchingEngine:
+    global hf_batching_engine
+    if hf_batching_engine is None:
+        _load_hf_model()
+        # 동시에 들어온 첫 요청들이 각자 엔진(워커 스레드)을 만들지 않도록
+        with _hf_init_lock:
+            if hf_batching_engine is None:
+                hf_batching_engine = BatchingEngine(
+                    hf_model, hf_tokenizer, prefix_cache=_get_prefix_cache(), generate_lock=_hf_generate_lock
+                )
+    return hf_batching_engine
+
+
+def _hf_generate(system_prompt: str, input_ids, **generate_kwargs):
+    """시스템 프롬프트 prefix KV 캐시가 켜져 있으면 재사용해서 generate. prefill/decode 시간도 기록."""
+    timer = GenerationTimer()
+    generate_kwargs = with_timer(generate_kwargs, timer)
+    prefix_cache = _get_prefix_cache()
+    # 배치 워커와 같은 락 -> 스트리밍/비배치 생성이 배치 generate 와 동시에 모델을 쓰지 않음
+    with _hf_generate_lock:
+        if prefix_cache is not None:
+            output = prefix_cache.generate(system_prompt, input_ids, **generate_kwargs)
+        else:
+            output = hf_model.generate(input_ids, **generate_kwargs)
+    timer.finish(int(output.shape[-1] - input_ids.shape[-1]) * output.shape[0], output.shape[0])
+    return output
+
+
+def batching_stats() -> Optional[Dict]:
+    client = get_model_client()
+    if client is not None:
+        return client.stats().get("hf_batching")
+    return hf_batching_engine.stats() if hf_batching_engine is not None else None
+
+
+def prefix_cache_stats() -> Optional[Dict]:
+    client = get_model_client()
+    if client is not None:
+        return client.stats().get("hf_prefix_cache")
+    return hf_prefix_cache.stats() if hf_prefix_cache is not None else None
+
 # 제미나이 모델 로드
 def _load_gemini_model() -> None:
-    global gemini_client
-    if gemini_client is None:
+    def load():
+        global gemini_client
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             raise ValueError("환경 변수 GOOGLE_API_KEY가 없음. .env 파일에서 추가하세요.")
+        genai = _genai()
         genai.configure(api_key=api_key)
         gemini_client = genai.GenerativeModel(GEMINI_MODEL_NAME)
 
+    if gemini_client is None:
+        _track_load("gemini", load)
 
-def make_response(
-    user_question: str,  # 사용자의 실제 질문
-    db_data: Optional[List[Dict]] = None,  # DB 검색으로 얻은 판례 데이터
-    system_prompt: str = "당신은 법률 전문가이며, 오직 다음의 판례 데이터만을 참고하여 사용자 질문에 답변해야 합니다. 제공된 데이터에 없는 내용은 답변할 수 없습니다.",
-    model_type: str = "huggingface",  # 사용할 AI 모델 타입 ('huggingface' 또는 'gemini')
-    max_new_tokens: int = 1024,
-    temperature: float = 0.7,
-):
-    # 디버깅 목적. AI 모델이 제대로 DB를 넘겨받았는지 확인하기 위한 용도임. 
-    print("\n--- DB에서 검색된 판례 데이터 ---")
-    print(db_data)
-    print("-FIN-\n")
-    # 여기까지가 디버깅 용도 코드.
 
+def warm_up(backends: List[str], generate: bool = True) -> None:
+    """모델을 미리 로드하고 짧은 더미 생성을 한 번 돌려서 첫 요청의 지연을 없앰."""
+    for name in backends:
+        try:
+            if name == "huggingface" and get_model_client() is not None:
+                continue  # 모델은 추론 서버가 로드/워밍업함 (readiness 는 서버에 물어봄)
+            if name == "huggingface":
+                _load_hf_model()
+                if generate:
+                    # 기본 시스템 프롬프트의 prefix KV 캐시도 이때 미리 만들어 둠
+                    input_ids = _hf_input_ids(DEFAULT_SYSTEM_PROMPT, "안녕하세요")
+                    _hf_generate(DEFAULT_SYSTEM_PROMPT, input_ids, max_new_tokens=1, do_sample=False)
+            elif name == "gemini":
+                _load_gemini_model()
+                if generate:
+                    gemini_client.generate_content(
+                        "안녕하세요", generation_config=_genai().GenerationConfig(max_output_tokens=1)
+                    )
+            else:
+                print(f"⚠️  알 수 없는 모델 백엔드: {name}")
+                continue
+            backend_state[name]["warmed_up"] = True
+        except Exception as e:
+            backend_state[name].update(status="failed", error=str(e))
+            print(f"❌ {name} 모델 워밍업 실패: {e}")
+
+
+def start_warm_up() -> Optional[threading.Thread]:
+    """MODEL_PRELOAD 에 지정된 백엔드를 백그라운드 스레드에서 워밍업 (/health 는 바로 응답)."""
+    if not MODEL_PRELOAD:
+        return None
+    thread = threading.Thread(
+        target=warm_up, args=(MODEL_PRELOAD, MODEL_WARMUP_GENERATE), name="model-warmup", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def readiness() -> Dict:
+    """미리 로드하기로 한 백엔드가 모두 준비됐는지 + 백엔드별 상태."""
+    backends = {name: dict(state) for name, state in backend_state.items()}
+    client = get_model_client()
+    if client is not None:
+        try:
+            remote = client.readiness()
+            remote.pop("ok", None)
+            backends["huggingface"] = {**remote, "model_server": client.socket_path}
+        except Exception as e:
+            backends["huggingface"] = {"status": "unreachable", "warmed_up": False, "error": str(e),
+                                       "model_server": client.socket_path}
+    ready = all(
+        backends.get(name, {}).get("status") == "ready"
+        and (backends[name].get("warmed_up") or not MODEL_WARMUP_GENERATE)
+        for name in MODEL_PRELOAD
+    )
+    return {"ready": ready, "preload": MODEL_PRELOAD, "backends": backends}
+
+
+def get_token_counter(model_type: str) -> Callable[[str], int]:
+    """현재 백엔드 기준 토큰 수 계산 함수. 허깅페이스는 실제 토크나이저, 제미나이는 글자 수 기반 추정."""
+    if model_type == "huggingface":
+        if get_model_client() is not None:
+            _load_hf_tokenizer()
+        else:
+            _load_hf_model()
+        return lambda text: len(hf_tokenizer.encode(text, add_special_tokens=False))
+    # 제미나이 count_tokens 는 네트워크 호출이라 발췌문마다 쓰기엔 비쌈
+    return lambda text: math.ceil(len(text) / GEMINI_CHARS_PER_TOKEN)
+
+
+def _build_message(user_question: str, db_data: Optional[List[Dict]]) -> str:
     # 사용자 질문과 DB 결과를 합쳐서 AI에게 전달할 전체 메시지 생성
     full_message = user_question
     if db_data:
         db_text = "\n\n다음은 당신이 참고할 법률 판례 데이터입니다:\n"
         for i, item in enumerate(db_data):
+            if "passages" in item:
+                # build_context 로 고른 발췌문만 출처와 함께 넣음
+                db_text += f"- 판례 {i+1}: {citation_line(item)}\n"
+                for j, passage in enumerate(item["passages"]):
+                    db_text += f"  [발췌 {j+1}] {passage}\n"
+                continue
             db_text += f"- 판례 {i+1}: 사건명: {item.get('title')}, 법원: {item.get('court')}, 선고일: {item.get('date')}, 상세 내용: {item.get('case_precedent')}\n"
         full_message += db_text
-        
+    return full_message
+
+
+def _hf_input_ids(system_prompt: str, full_message: str):
+    # 대화 템플릿에 맞게 메시지 구성
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": full_message}
+    ]
+    with timed("tokenize"):
+        return hf_tokenizer.apply_chat_template(messages, return_tensors="pt").to(hf_model.device)
+
+
+def make_response(
+    user_question: str,  # 사용자의 실제 질문
+    db_data: Optional[List[Dict]] = None,  # DB 검색으로 얻은 판례 데이터
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+    model_type: str = "huggingface",  # 사용할 AI 모델 타입 ('huggingface' 또는 'gemini')
+    max_new_tokens: int = 1024,
+    temperature: float = 0.7,
+):
+    # 추론 서버 모드면 허깅페이스 생성은 모델을 가진 별도 프로세스에 위임
+    client = get_model_client()
+    if model_type == "huggingface" and client is not None:
+        return client.generate(
+            user_question=user_question, db_data=db_data, system_prompt=system_prompt,
+            max_new_tokens=max_new_tokens, temperature=temperature,
+        )
+    return make_response_local(user_question, db_data, system_prompt, model_type, max_new_tokens, temperature)
+
+
+def make_response_local(
+    user_question: str,  # 사용자의 실제 질문
+    db_data: Optional[List[Dict]] = None,  # DB 검색으로 얻은 판례 데이터
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+    model_type: str = "huggingface",  # 사용할 AI 모델 타입 ('huggingface' 또는 'gemini')
+    max_new_tokens: int = 1024,
+    temperature: float = 0.7,
+):
+    full_message = _build_message(user_question, db_data)
+
     # 모델 타입에 따라 다른 AI 모델 API 호출
     if model_type == "gemini":
         _load_gemini_model()  # 제미나이 모델 로드
@@ -66,27 +297,29 @@ def make_response(
 
         # 프롬프트 구성 및 제미나이 API 호출
         full_prompt = f"{system_prompt}\n\nUser: {full_message}"
-        response = gemini_client.generate_content(
-            full_prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_new_tokens
+        with timed("llm"):
+            response = gemini_client.generate_content(
+                full_prompt,
+                generation_config=_genai().GenerationConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_new_tokens
+                )
             )
-        )
+        _count_gemini_tokens(response)
         return response.text
     elif model_type == "huggingface":
         _load_hf_model()  # 허깅페이스 모델 로드
         assert hf_tokenizer is not None and hf_model is not None
 
-        # 대화 템플릿에 맞게 메시지 구성
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": full_message}
-        ]
-
         # 텍스트를 토큰으로 변환하고 모델에 전달
-        input_ids = hf_tokenizer.apply_chat_template(messages, return_tensors="pt").to(hf_model.device)
-        output = hf_model.generate(
+        input_ids = _hf_input_ids(system_prompt, full_message)
+        if HF_BATCHING:
+            # 다른 요청들과 묶어서 한 번에 생성 (대기열이 가득 차면 QueueFullError)
+            return _get_batching_engine().generate(
+                input_ids[0].tolist(), max_new_tokens, temperature, prefix_key=system_prompt
+            )
+        output = _hf_generate(
+            system_prompt,
             input_ids,
             max_new_tokens=max_new_tokens,
             temperature=temperature,
@@ -97,4 +330,147 @@ def make_response(
         return result
     else:
         # 지원하지 않는 모델 타입인 경우 에러 메시지 반환
-        return f"잘못된 모델 {model_type}. 'huggingface' 또는 'gemini'를 선택해주세요."
\ No newline at end of file
+        return f"잘못된 모델 {model_type}. 'huggingface' 또는 'gemini'를 선택해주세요."
+
+
+def _count_gemini_tokens(response) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    tokens = getattr(usage, "candidates_token_count", None) if usage is not None else None
+    if tokens:
+        LLM_GENERATED_TOKENS.inc(tokens, backend="gemini")
+
+
+def _cancel_criteria(cancelled: threading.Event):
+    """cancel 이벤트가 설정되면 다음 토큰에서 generate 를 멈추는 StoppingCriteriaList."""
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class _CancelCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full((input_ids.shape[0],), cancelled.is_set(), dtype=torch.bool, device=input_ids.device)
+
+    return StoppingCriteriaList([_CancelCriteria()])
+
+
+class TokenStream:
+    """생성되는 텍스트 조각을 순서대로 내주는 이터레이터. cancel() 하면 생성을 중단함.
+
+    생성 스레드가 실패하면 error 에 예외를 남기고, 남은 조각을 다 내준 뒤 그 예외를 다시 던짐
+    (정상 종료로 보이면 잘린 답변이 완료된 답변처럼 캐시됨).
+    """
+
+    def __init__(self, chunks: Iterator[str], cancelled: threading.Event):
+        self._chunks = chunks
+        self.cancelled = cancelled
+        self.error: Optional[BaseException] = None
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self.cancelled.is_set():
+                break
+            if chunk:
+                yield chunk
+        if self.error is not None and not self.cancelled.is_set():
+            raise self.error
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+def stream_response(
+    user_question: str,
+    db_data: Optional[List[Dict]] = None,
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+    model_type: str = "huggingface",
+    max_new_tokens: int = 1024,
+    temperature: float = 0.7,
+):
+    """make_response 의 스트리밍 버전. 토큰이 생성되는 대로 텍스트 조각을 내줌."""
+    client = get_model_client()
+    if model_type == "huggingface" and client is not None:
+        return client.stream(
+            user_question=user_question, db_data=db_data, system_prompt=system_prompt,
+            max_new_tokens=max_new_tokens, temperature=temperature,
+        )
+    return stream_response_local(user_question, db_data, system_prompt, model_type, max_new_tokens, temperature)
+
+
+def stream_response_local(
+    user_question: str,
+    db_data: Optional[List[Dict]] = None,
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+    model_type: str = "huggingface",
+    max_new_tokens: int = 1024,
+    temperature: float = 0.7,
+) -> TokenStream:
+    full_message = _build_message(user_question, db_data)
+    cancelled = threading.Event()
+
+    if model_type == "gemini":
+        _load_gemini_model()
+        assert gemini_client is not None
+
+        def gemini_chunks():
+            started = time.perf_counter()
+            response = gemini_client.generate_content(
+                f"{system_prompt}\n\nUser: {full_message}",
+                generation_config=_genai().GenerationConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_new_tokens
+                ),
+                stream=True,
+            )
+            try:
+                first = True
+                for chunk in response:
+                    if first:
+                        # 스트리밍은 첫 조각까지를 prefill 로 봄
+                        observe_stage("prefill", time.perf_counter() - started)
+                        first = False
+                    if cancelled.is_set():
+                        break
+                    yield chunk.text
+            finally:
+                observe_stage("llm", time.perf_counter() - started)
+                # 더 이상 읽지 않으면 응답 스트림을 닫아서 API 호출도 정리
+                close = getattr(response, "close", None)
+                if close:
+                    close()
+
+        return TokenStream(gemini_chunks(), cancelled)
+
+    if model_type == "huggingface":
+        _load_hf_model()
+        assert hf_tokenizer is not None and hf_model is not None
+
+        input_ids = _hf_input_ids(system_prompt, full_message)
+        from transformers import TextIteratorStreamer
+
+        streamer = TextIteratorStreamer(hf_tokenizer, skip_prompt=True, skip_special_tokens=True)
+        stream = TokenStream(iter(streamer), cancelled)
+
+        # generate 는 별도 스레드에서 돌리고, streamer 가 토큰을 큐로 넘겨줌
+        def run(*args, **kwargs):
+            try:
+                _hf_generate(*args, **kwargs)
+            except Exception as e:
+                logger.exception("스트리밍 생성 실패")
+                stream.error = e  # end() 보다 먼저 남겨야 소비하는 쪽이 정상 종료로 착각하지 않음
+                streamer.end()  # 소비하는 쪽이 영원히 기다리지 않도록 스트림 종료
+
+        thread = threading.Thread(
+            target=run,
+            args=(system_prompt, input_ids),
+            kwargs=dict(
+                max_new_tokens=max_new_tokens,
+                temperature=temperature,
+                do_sample=True,
+                streamer=streamer,
+                stopping_criteria=_cancel_criteria(cancelled),
+            ),
+            daemon=True,
+        )
+        thread.start()
+        return stream
+
+    raise ValueError(f"잘못된 모델 {model_type}. 'huggingface' 또는 'gemini'를 선택해주세요.")
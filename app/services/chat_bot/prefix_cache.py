@@ -0,0 +1,103 @@
+import copy
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 시스템 프롬프트 prefix 의 KV 캐시 재사용 (허깅페이스 전용)
+HF_PREFIX_CACHE = os.getenv("HF_PREFIX_CACHE", "1") == "1"
+HF_PREFIX_CACHE_SIZE = int(os.getenv("HF_PREFIX_CACHE_SIZE", "4"))  # 보관할 시스템 프롬프트 수
+
+# prefix 토큰을 찾을 때 쓰는 서로 다른 더미 사용자 메시지
+_PROBES = ("가", "나다")
+
+
+@dataclass
+class _Entry:
+    prefix_ids: List[int]
+    past_key_values: Any
+
+
+class PrefixCache:
+    """시스템 프롬프트(+ 사용자 턴 헤더)까지의 KV 상태를 한 번만 계산해두고 generate 때 재사용.
+
+    매 요청은 캐시를 복사해서 이어 쓰므로, 사용자별 뒷부분만 prefill 하면 됨.
+    """
+
+    def __init__(self, model, tokenizer, max_entries: int = HF_PREFIX_CACHE_SIZE):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def _template_ids(self, system_prompt: str, user_content: str) -> List[int]:
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_content}]
+        ids = self.tokenizer.apply_chat_template(messages, return_tensors="pt")
+        return ids[0].tolist()
+
+    def _prefix_ids(self, system_prompt: str) -> List[int]:
+        # 사용자 메시지만 다른 두 템플릿의 공통 앞부분 = 모든 요청이 공유하는 prefix
+        a, b = (self._template_ids(system_prompt, probe) for probe in _PROBES)
+        n = 0
+        while n < min(len(a), len(b)) and a[n] == b[n]:
+            n += 1
+        return a[:n]
+
+    def _build(self, system_prompt: str) -> _Entry:
+        import torch
+
+        prefix_ids = self._prefix_ids(system_prompt)
+        with torch.inference_mode():
+            out = self.model(
+                input_ids=torch.tensor([prefix_ids], device=self.model.device),
+                use_cache=True,
+            )
+        self.builds += 1
+        return _Entry(prefix_ids=prefix_ids, past_key_values=out.past_key_values)
+
+    def get(self, system_prompt: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(system_prompt)
+            if entry is None:
+                entry = self._build(system_prompt)
+                self._entries[system_prompt] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)  # 가장 오래 안 쓴 프롬프트 제거
+            self._entries.move_to_end(system_prompt)
+            return entry
+
+    def generate(self, system_prompt: str, input_ids, **generate_kwargs):
+        """input_ids 가 캐시된 prefix 로 시작하면 KV 캐시 사본을 넘겨서 나머지만 prefill."""
+        entry = self.get(system_prompt)
+        ids = input_ids[0].tolist()
+        n = len(entry.prefix_ids)
+        if input_ids.shape[0] == 1 and len(ids) > n and ids[:n] == entry.prefix_ids:
+            # generate 가 캐시를 이어서 채우므로 원본이 오염되지 않게 복사본 사용
+            generate_kwargs["past_key_values"] = copy.deepcopy(entry.past_key_values)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return self.model.generate(input_ids, **generate_kwargs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "builds": self.builds,
+            "prefix_tokens": {k[:30]: len(e.prefix_ids) for k, e in self._entries.items()},
+        }
@@ -0,0 +1,56 @@
+import time
+from typing import Optional
+
+from app.utils.metrics import LLM_DECODE_TOKENS_PER_SECOND, LLM_GENERATED_TOKENS, observe_stage
+
+
+class GenerationTimer:
+    """generate 한 번을 prefill(첫 토큰까지) / decode(나머지 토큰) 로 나눠서 측정.
+
+    stopping_criteria() 를 generate 에 넘기면 토큰이 하나 생성될 때마다 호출되므로,
+    첫 호출 시각이 prefill 이 끝난 시점이 됨.
+    """
+
+    def __init__(self, backend: str = "huggingface"):
+        self.backend = backend
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+    def mark_first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def stopping_criteria(self):
+        import torch
+        from transformers import StoppingCriteria
+
+        timer = self
+
+        class _FirstTokenCriteria(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                timer.mark_first_token()
+                return torch.zeros((input_ids.shape[0],), dtype=torch.bool, device=input_ids.device)
+
+        return _FirstTokenCriteria()
+
+    def finish(self, generated_tokens: int, sequences: int = 1) -> None:
+        """generated_tokens: 배치 전체에서 생성된 토큰 수, sequences: 배치 크기."""
+        ended = time.perf_counter()
+        first = self.first_token_at or ended
+        observe_stage("prefill", first - self.started)
+        decode_seconds = ended - first
+        observe_stage("decode", decode_seconds)
+        LLM_GENERATED_TOKENS.inc(generated_tokens, backend=self.backend)
+        # 첫 토큰은 prefill 에서 나오므로 decode 토큰 수에서 뺌
+        decode_tokens = generated_tokens - sequences
+        if decode_seconds > 0 and decode_tokens > 0:
+            LLM_DECODE_TOKENS_PER_SECOND.observe(decode_tokens / decode_seconds, backend=self.backend)
+
+
+def with_timer(generate_kwargs: dict, timer: GenerationTimer) -> dict:
+    """generate_kwargs 의 stopping_criteria 에 타이머를 추가한 사본."""
+    from transformers import StoppingCriteriaList
+
+    criteria = StoppingCriteriaList(generate_kwargs.get("stopping_criteria") or [])
+    criteria.append(timer.stopping_criteria())
+    return {**generate_kwargs, "stopping_criteria": criteria}
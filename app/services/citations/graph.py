@@ -0,0 +1,273 @@
+import os
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.model import CitationIndexState, Judgement, JudgementCitation, JudgementStatuteRef
+from app.utils.crawl import content_hash, register_save_listener
+from .parser import normalize_case_number, parse_case_citations, parse_statute_citations
+
+load_dotenv()
+
+CITATION_BACKFILL_BATCH_SIZE = int(os.getenv("CITATION_BACKFILL_BATCH_SIZE", "1000"))
+# 다단계 이웃 탐색의 안전장치 (최대 깊이, 한 번에 모으는 최대 판례 수)
+CITATION_MAX_DEPTH = int(os.getenv("CITATION_MAX_DEPTH", "3"))
+CITATION_NEIGHBORHOOD_MAX_NODES = int(os.getenv("CITATION_NEIGHBORHOOD_MAX_NODES", "500"))
+
+DIRECTIONS = ("citing", "cited_by", "both")
+
+# 저장된 사건번호에서 공백을 없앤 값. 간선의 cited_case_number 는 normalize_case_number 를 거친 표기라
+# 판례와 이을 때는 항상 이 식으로 비교함 (ix_judgements_case_number_key 표현식 인덱스를 타도록 리터럴로 씀)
+CASE_NUMBER_KEY = func.replace(Judgement.case_number, literal_column("' '"), literal_column("''"))
+
+
+def ensure_citation_schema(bind) -> None:
+    """이미 배포된 DB 에 사건번호 표현식 인덱스를 보강."""
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_judgements_case_number_key "
+            "ON judgements (replace(case_number, ' ', ''))"
+        ))
+
+
+def index_rows(db: Session, rows: List[Dict]) -> int:
+    """판례 행(dict, id/reference/reference_case 포함)의 인용 간선을 다시 만듦. 커밋은 호출한 쪽에서."""
+    if not rows:
+        return 0
+    ids = [r["id"] for r in rows]
+    db.execute(delete(JudgementCitation).where(JudgementCitation.judgement_id.in_(ids)))
+    db.execute(delete(JudgementStatuteRef).where(JudgementStatuteRef.judgement_id.in_(ids)))
+    citations, statutes = [], []
+    for r in rows:
+        own = normalize_case_number(r.get("case_number"))
+        for position, cited in enumerate(parse_case_citations(r.get("reference_case"))):
+            if cited != own:
+                citations.append({"judgement_id": r["id"], "cited_case_number": cited, "position": position})
+        for position, (law_name, article) in enumerate(parse_statute_citations(r.get("reference"))):
+            statutes.append({"judgement_id": r["id"], "law_name": law_name, "article": article,
+                             "position": position})
+    if citations:
+        db.execute(pg_insert(JudgementCitation).values(citations).on_conflict_do_nothing())
+    if statutes:
+        db.execute(pg_insert(JudgementStatuteRef).values(statutes).on_conflict_do_nothing())
+    state = pg_insert(CitationIndexState).values([
+        # 백필은 DB 에 저장된 해시를 그대로 (NULL 이어도) 기록해야 다음 백필에서 다시 잡히지 않음
+        {"judgement_id": r["id"], "content_hash": r["content_hash"] if "content_hash" in r else content_hash(r)}
+        for r in rows
+    ])
+    db.execute(state.on_conflict_do_update(
+        index_elements=[CitationIndexState.judgement_id],
+        set_={"content_hash": state.excluded.content_hash, "updated_at": func.now()},
+    ))
+    return len(citations) + len(statutes)
+
+
+def _on_batch_saved(rows: List[Dict]) -> None:
+    # 저장(크롤링) 직후 바뀐 판례만 인용 간선 갱신
+    with SessionLocal() as db:
+        index_rows(db, rows)
+        db.commit()
+
+
+register_save_listener(_on_batch_saved)
+
+
+def backfill(db: Session, batch_size: int = CITATION_BACKFILL_BATCH_SIZE) -> int:
+    """간선이 없거나 이후 내용이 바뀐 판례(덤프 가져오기 등 저장 콜백을 거치지 않은 경우)를 색인. 처리 건수 반환."""
+    done = 0
+    while True:
+        stale = (
+            select(Judgement.id, Judgement.case_number, Judgement.reference, Judgement.reference_case,
+                   Judgement.content_hash)
+            .outerjoin(CitationIndexState, CitationIndexState.judgement_id == Judgement.id)
+            .where(
+                CitationIndexState.judgement_id.is_(None)
+                | CitationIndexState.content_hash.is_distinct_from(Judgement.content_hash)
+            )
+            .limit(batch_size)
+        )
+        rows = [dict(r._mapping) for r in db.execute(stale)]
+        if not rows:
+            return done
+        index_rows(db, rows)
+        db.commit()
+        done += len(rows)
+
+
+def _summary(j: Judgement) -> Dict:
+    return {
+        "id": str(j.id), "case_number": j.case_number, "title": j.case_name, "court": j.case_court,
+        "date": j.case_date.date().isoformat() if j.case_date else None,
+    }
+
+
+def find_judgement(db: Session, case_number: str) -> Optional[Judgement]:
+    stmt = select(Judgement).where(CASE_NUMBER_KEY == normalize_case_number(case_number)).limit(1)
+    return db.execute(stmt).scalars().first()
+
+
+def citing(db: Session, judgement: Judgement, limit: int, offset: int = 0) -> Dict:
+    """이 판례가 참조한 판례 (참조판례 순서). DB 에 없는 판례는 사건번호만 반환."""
+    base = select(JudgementCitation).where(JudgementCitation.judgement_id == judgement.id)
+    total = db.scalar(select(func.count()).select_from(base.subquery())) or 0
+    edges = db.execute(
+        base.order_by(JudgementCitation.position).limit(limit).offset(offset)
+    ).scalars().all()
+    found = _by_case_number(db, [e.cited_case_number for e in edges])
+    items = [
+        _summary(found[e.cited_case_number]) if e.cited_case_number in found
+        else {"case_number": e.cited_case_number, "id": None}
+        for e in edges
+    ]
+    return {"total": total, "limit": limit, "offset": offset, "items": items}
+
+
+def cited_by(db: Session, case_number: str, limit: int, offset: int = 0) -> Dict:
+    """이 사건번호를 참조판례로 인용한 판례 (최신순)."""
+    cond = JudgementCitation.cited_case_number == normalize_case_number(case_number)
+    total = db.scalar(select(func.count()).select_from(JudgementCitation).where(cond)) or 0
+    rows = db.execute(
+        select(Judgement)
+        .join(JudgementCitation, JudgementCitation.judgement_id == Judgement.id)
+        .where(cond)
+        .order_by(Judgement.case_date.desc(), Judgement.id.desc())
+        .limit(limit).offset(offset)
+    ).scalars().all()
+    return {"total": total, "limit": limit, "offset": offset, "items": [_summary(j) for j in rows]}
+
+
+def statutes(db: Session, judgement: Judgement) -> List[Dict]:
+    refs = db.execute(
+        select(JudgementStatuteRef)
+        .where(JudgementStatuteRef.judgement_id == judgement.id)
+        .order_by(JudgementStatuteRef.position)
+    ).scalars().all()
+    return [{"law_name": r.law_name, "article": r.article} for r in refs]
+
+
+def statute_cited_by(db: Session, law_name: str, article: Optional[str], limit: int, offset: int = 0) -> Dict:
+    """법령(또는 특정 조문)을 참조조문으로 인용한 판례 (최신순)."""
+    conds = [JudgementStatuteRef.law_name == law_name]
+    if article:
+        conds.append(JudgementStatuteRef.article == article)
+    # 한 판례가 같은 법령의 여러 조문을 인용해도 한 번만
+    ids = select(JudgementStatuteRef.judgement_id).where(*conds).distinct()
+    total = db.scalar(select(func.count()).select_from(ids.subquery())) or 0
+    rows = db.execute(
+        select(Judgement)
+        .where(Judgement.id.in_(ids))
+        .order_by(Judgement.case_date.desc(), Judgement.id.desc())
+        .limit(limit).offset(offset)
+    ).scalars().all()
+    return {"total": total, "limit": limit, "offset": offset, "items": [_summary(j) for j in rows]}
+
+
+def _by_case_number(db: Session, case_numbers: List[str]) -> Dict[str, Judgement]:
+    if not case_numbers:
+        return {}
+    rows = db.execute(select(Judgement).where(CASE_NUMBER_KEY.in_(set(case_numbers)))).scalars()
+    found: Dict[str, Judgement] = {}
+    for j in rows:
+        found.setdefault(normalize_case_number(j.case_number), j)
+    return found
+
+
+def neighborhood(db: Session, judgement: Judgement, depth: int = 2, direction: str = "both",
+                 limit: int = 50, offset: int = 0,
+                 max_nodes: int = CITATION_NEIGHBORHOOD_MAX_NODES) -> Dict:
+    """인용 관계를 depth 단계까지 너비 우선으로 따라간 판례 목록 (가까운 단계부터).
+
+    단계마다 간선 조회 한 번 + 판례 조회 한 번이라 깊이만큼만 쿼리함. 결과는 max_nodes 에서 자름.
+    """
+    depth = max(1, min(depth, CITATION_MAX_DEPTH))
+    seen = {normalize_case_number(judgement.case_number)}
+    frontier: Dict[str, Optional[Judgement]] = {normalize_case_number(judgement.case_number): judgement}
+    nodes: List[Dict] = []
+    hop = 0
+    truncated = False
+    while frontier and hop < depth and not truncated:
+        hop += 1
+        edges = []
+        ids = [j.id for j in frontier.values() if j is not None]
+        if direction in ("citing", "both") and ids:
+            stmt = select(JudgementCitation.cited_case_number).where(JudgementCitation.judgement_id.in_(ids))
+            edges += [(number, "citing") for number in db.execute(stmt).scalars()]
+        if direction in ("cited_by", "both"):
+            stmt = (
+                select(Judgement.case_number)
+                .join(JudgementCitation, JudgementCitation.judgement_id == Judgement.id)
+                .where(JudgementCitation.cited_case_number.in_(list(frontier)))
+            )
+            edges += [(normalize_case_number(number), "cited_by") for number in db.execute(stmt).scalars()]
+
+        discovered: Dict[str, str] = {}
+        for number, relation in edges:
+            if number in seen:
+                continue
+            if len(seen) > max_nodes:
+                truncated = True
+                break
+            seen.add(number)
+            discovered[number] = relation
+        found = _by_case_number(db, list(discovered))
+        for number in sorted(discovered):
+            j = found.get(number)
+            node = _summary(j) if j is not None else {"case_number": number, "id": None}
+            nodes.append({**node, "hop": hop, "relation": discovered[number]})
+        frontier = {number: found.get(number) for number in discovered}
+
+    return {
+        "case_number": judgement.case_number, "depth": depth, "direction": direction,
+        "total": len(nodes), "truncated": truncated, "limit": limit, "offset": offset,
+        "items": nodes[offset:offset + limit],
+    }
+
+
+def cited_context_rows(db: Session, judgement_ids: List, limit: int) -> List[Dict]:
+    """챗봇 컨텍스트 보강용: 검색된 판례들이 인용한 판례 중 DB 에 있는 것을 최대 limit 개.
+
+    인덱스 조회 한 번이고, 본문 대신 판시사항/판결요지만 넘겨서 토큰을 적게 씀.
+    """
+    if not judgement_ids or limit <= 0:
+        return []
+    citing_case = Judgement.__table__.alias("citing_case")
+    stmt = (
+        select(Judgement, citing_case.c.case_number.label("cited_from"))
+        .join(JudgementCitation, JudgementCitation.cited_case_number == CASE_NUMBER_KEY)
+        .join(citing_case, citing_case.c.id == JudgementCitation.judgement_id)
+        .where(JudgementCitation.judgement_id.in_(judgement_ids), Judgement.id.not_in(judgement_ids))
+        .order_by(JudgementCitation.position)
+        .limit(limit * 3)
+    )
+    rows, seen = [], set()
+    for j, cited_from in db.execute(stmt):
+        if j.id in seen:
+            continue
+        seen.add(j.id)
+        rows.append({
+            "id": str(j.id),
+            "updated_at": j.updated_at.isoformat() if j.updated_at else None,
+            "title": j.case_name,
+            "court": j.case_court,
+            "date": j.case_date.isoformat() if j.case_date else None,
+            "case_number": j.case_number,
+            "decision": j.case_result_decision,
+            "summary": j.case_result_summary,
+            "case_precedent": None,
+            "cited_from": cited_from,
+        })
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+if __name__ == "__main__":
+    # 기존 판례 인용 관계 색인: python -m app.services.citations.graph
+    with SessionLocal() as db:
+        print(f"{backfill(db)}건 인용 관계 색인 완료")
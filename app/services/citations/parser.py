@@ -0,0 +1,64 @@
+import re
+from typing import List, Optional, Tuple
+
+# 사건번호: 연도(2~4자리) + 사건부호(한글 1~3자) + 일련번호. 예) 2008다12345, 84다카1234, 2010헌바12
+# 공보 인용 "(공2009하, 1234)" 처럼 쉼표로 끊기는 것은 잡지 않음
+_CASE_NUMBER = re.compile(r"(?<![\d가-힣])(\d{2}|\d{4})\s?([가-힣]{1,3})\s?(\d{1,7})(?!\d)")
+
+# 참조조문: 법령명 뒤에 바로 "제N조" 가 오는 경우만 법령명으로 봄
+# 예) 민법 제750조, 구 근로기준법 제30조 제1항, 특정경제범죄 가중처벌 등에 관한 법률 제3조
+_LAW_NAME = r"(?:[가-힣ㆍ·]+\s)*?[가-힣ㆍ·]*(?:법|법률|령|규칙|규정|조례)"
+_STATUTE = re.compile(rf"(?P<law>{_LAW_NAME})?\s*제\s*(?P<article>\d+)\s*조(?:\s*의\s*(?P<sub>\d+))?")
+_PARENS = re.compile(r"\([^()]*\)")
+# 직전 법령을 다시 가리키는 표현
+_SAME_LAW = {"같은 법", "같은법", "동법", "동 법"}
+
+
+def normalize_case_number(text: Optional[str]) -> str:
+    """사건번호 표기의 공백을 없앰 (2008 다 12345 -> 2008다12345)."""
+    return re.sub(r"\s+", "", text or "")
+
+
+def parse_case_citations(reference_case: Optional[str]) -> List[str]:
+    """참조판례 텍스트에서 사건번호 목록을 등장 순서대로 (중복 제거) 추출."""
+    if not reference_case:
+        return []
+    found = [f"{m.group(1)}{m.group(2)}{m.group(3)}" for m in _CASE_NUMBER.finditer(reference_case)]
+    return list(dict.fromkeys(found))
+
+
+def _normalize_law(name: str) -> str:
+    name = " ".join(name.split())
+    # "구 근로기준법"(개정 전 법령) 도 같은 법령으로 묶음
+    return name[2:] if name.startswith("구 ") else name
+
+
+def parse_statute_citations(reference: Optional[str]) -> List[Tuple[str, str]]:
+    """참조조문 텍스트에서 (법령명, 조문) 목록을 추출. 법령명이 생략된 조문은 직전 법령으로 봄.
+
+    예) "민법 제750조, 제751조, 구 근로기준법(2007. 4. 11. 개정 전) 제30조 제1항"
+        -> [("민법", "제750조"), ("민법", "제751조"), ("근로기준법", "제30조")]
+    """
+    if not reference:
+        return []
+    # 괄호 안의 개정 이력("법률 제8372호로 개정되기 전의 것") 은 조문으로 잡히지 않게 제거
+    text = reference
+    while True:
+        stripped = _PARENS.sub(" ", text)
+        if stripped == text:
+            break
+        text = stripped
+
+    refs: List[Tuple[str, str]] = []
+    current_law: Optional[str] = None
+    for m in _STATUTE.finditer(text):
+        law = m.group("law")
+        if law:
+            law = _normalize_law(law)
+            if law not in _SAME_LAW:
+                current_law = law
+        if current_law is None:
+            continue
+        article = f"제{m.group('article')}조" + (f"의{m.group('sub')}" if m.group("sub") else "")
+        refs.append((current_law, article))
+    return list(dict.fromkeys(refs))
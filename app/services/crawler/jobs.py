@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import or_, select, text, update
+
+from app.db import SessionLocal
+from app.models.model import CrawlJob, CrawlJobPage
+from app.utils.crawl import existing_source_ids
+from .pipeline import CrawlPipeline
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 작업 임대(lease) 시간. 워커가 죽으면 만료 후 다른 워커(또는 재시작한 워커)가 이어서 진행함.
+CRAWL_JOB_LEASE_SECONDS = int(os.getenv("CRAWL_JOB_LEASE_SECONDS", "120"))
+# 끝 페이지가 없는 작업의 안전장치
+CRAWL_JOB_MAX_PAGES = int(os.getenv("CRAWL_JOB_MAX_PAGES", "1000"))
+
+ACTIVE_STATUSES = ("pending", "running")
+# 저장 성공 건의 세부 결과 (save_law_data_batch 의 status)
+CHANGE_STATUSES = ("inserted", "updated", "unchanged")
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def ensure_crawl_schema(bind) -> None:
+    """기존 테이블에 원본 판례일련번호 / 내용 해시 / 작업별 신규·수정·변경없음 건수 컬럼을 보강하고 resync 를 boolean 으로."""
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.begin() as conn:
+        conn.execute(text("ALTER TABLE judgements ADD COLUMN IF NOT EXISTS source_id VARCHAR(20)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_judgements_source_id ON judgements (source_id)"))
+        conn.execute(text("ALTER TABLE judgements ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)"))
+        for table in ("crawl_jobs", "crawl_job_pages"):
+            for column in CHANGE_STATUSES:
+                conn.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} INTEGER NOT NULL DEFAULT 0"
+                ))
+        # 예전에 0/1 정수로 만들어진 resync 컬럼은 boolean 으로 변환
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'crawl_jobs' AND column_name = 'resync' AND data_type = 'integer'
+                ) THEN
+                    ALTER TABLE crawl_jobs
+                        ALTER COLUMN resync DROP DEFAULT,
+                        ALTER COLUMN resync TYPE BOOLEAN USING resync <> 0,
+                        ALTER COLUMN resync SET DEFAULT FALSE;
+                END IF;
+            END
+            $$
+        """))
+
+
+def job_to_dict(job: CrawlJob) -> Dict:
+    total_pages = job.page_end - job.page_start + 1 if job.page_end else None
+    return {
+        "id": job.id,
+        "keyword": job.keyword,
+        "page_start": job.page_start,
+        "page_end": job.page_end,
+        "resync": job.resync,
+        "status": job.status,
+        "next_page": job.next_page,
+        "pages_done": job.pages_done,
+        "total_pages": total_pages,
+        "progress": round(job.pages_done / total_pages, 4) if total_pages else None,
+        "fetched": job.fetched,
+        "saved": job.saved,
+        "failed": job.failed,
+        "skipped": job.skipped,
+        "inserted": job.inserted,
+        "updated": job.updated,
+        "unchanged": job.unchanged,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+def create_job(keyword: str, page_start: int = 1, page_end: Optional[int] = None, resync: bool = False) -> CrawlJob:
+    with SessionLocal() as db:
+        job = CrawlJob(
+            keyword=keyword, page_start=page_start, page_end=page_end,
+            resync=resync, status="pending", next_page=page_start,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+
+def get_job(job_id: uuid.UUID) -> Optional[CrawlJob]:
+    with SessionLocal() as db:
+        return db.get(CrawlJob, job_id)
+
+
+def list_job_pages(job_id: uuid.UUID):
+    with SessionLocal() as db:
+        stmt = select(CrawlJobPage).where(CrawlJobPage.job_id == job_id).order_by(CrawlJobPage.page)
+        return db.execute(stmt).scalars().all()
+
+
+def _set_status(job_id: uuid.UUID, status: str, error: Optional[str] = None, only_from=None) -> bool:
+    with SessionLocal() as db:
+        stmt = update(CrawlJob).where(CrawlJob.id == job_id)
+        if only_from:
+            stmt = stmt.where(CrawlJob.status.in_(only_from))
+        values = {"status": status, "error": error, "updated_at": datetime.now()}
+        if status not in ACTIVE_STATUSES:
+            values.update(lease_owner=None, lease_expires_at=None)
+        changed = db.execute(stmt.values(**values)).rowcount
+        db.commit()
+        return bool(changed)
+
+
+def _claim(job_id: uuid.UUID) -> bool:
+    """작업 임대를 획득 (대기 중이거나 임대가 만료된 경우, 혹은 이미 내 임대인 경우)."""
+    now = datetime.now()
+    with SessionLocal() as db:
+        changed = db.execute(
+            update(CrawlJob)
+            .where(
+                CrawlJob.id == job_id,
+                CrawlJob.status.in_(ACTIVE_STATUSES),
+                or_(
+                    CrawlJob.lease_expires_at.is_(None),
+                    CrawlJob.lease_expires_at < now,
+                    CrawlJob.lease_owner == WORKER_ID,
+                ),
+            )
+            .values(
+                status="running", lease_owner=WORKER_ID,
+                lease_expires_at=now + timedelta(seconds=CRAWL_JOB_LEASE_SECONDS),
+            )
+        ).rowcount
+        db.commit()
+        return bool(changed)
+
+
+def _checkpoint(job_id: uuid.UUID, page: int, ids: int, saved: int, failed: int, skipped: int,
+                changes: Optional[Dict[str, int]] = None) -> bool:
+    """페이지 결과와 작업 진행 상황을 한 트랜잭션으로 기록. 작업이 취소됐거나 임대를 잃었으면 False."""
+    now = datetime.now()
+    with SessionLocal() as db:
+        job = db.execute(
+            select(CrawlJob).where(CrawlJob.id == job_id).with_for_update()
+        ).scalar_one_or_none()
+        if job is None or job.status != "running" or job.lease_owner != WORKER_ID:
+            db.rollback()
+            return False
+        changes = {status: (changes or {}).get(status, 0) for status in CHANGE_STATUSES}
+        db.add(CrawlJobPage(job_id=job_id, page=page, ids=ids, saved=saved, failed=failed, skipped=skipped, **changes))
+        job.next_page = page + 1
+        job.pages_done += 1
+        job.fetched += ids - skipped
+        job.saved += saved
+        job.failed += failed
+        job.skipped += skipped
+        for status, count in changes.items():
+            setattr(job, status, getattr(job, status) + count)
+        job.lease_expires_at = now + timedelta(seconds=CRAWL_JOB_LEASE_SECONDS)
+        db.commit()
+        return True
+
+
+def _release(job_id: uuid.UUID) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job_id, CrawlJob.lease_owner == WORKER_ID)
+            .values(lease_owner=None, lease_expires_at=None)
+        )
+        db.commit()
+
+
+class CrawlJobRunner:
+    """앱 프로세스 안에서 크롤링 작업을 asyncio 태스크로 실행."""
+
+    def __init__(self):
+        self._tasks: Dict[uuid.UUID, asyncio.Task] = {}
+        self._watcher: Optional[asyncio.Task] = None
+
+    def start(self, job_id: uuid.UUID) -> None:
+        task = self._tasks.get(job_id)
+        if task is not None and not task.done():
+            return
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id))
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        if not await asyncio.to_thread(_claim, job_id):
+            return
+        try:
+            job = await asyncio.to_thread(get_job, job_id)
+            pipeline = CrawlPipeline()
+            page = job.next_page
+            last_page = job.page_end or job.page_start + CRAWL_JOB_MAX_PAGES - 1
+            while page <= last_page:
+                ids = await pipeline.fetch_list(job.keyword, page)
+                if not ids and job.page_end is None:
+                    break
+                skipped = 0
+                if not job.resync:
+                    # 증분 동기화: 이미 보유한 판례일련번호는 다시 조회하지 않음
+                    known = await asyncio.to_thread(existing_source_ids, ids)
+                    skipped = sum(1 for i in ids if i in known)
+                    ids_to_fetch = [i for i in ids if i not in known]
+                else:
+                    ids_to_fetch = ids
+                results = await pipeline.crawl_ids(ids_to_fetch)
+                saved = sum(1 for r in results if r.saved)
+                changes = {status: sum(1 for r in results if r.status == status) for status in CHANGE_STATUSES}
+                ok = await asyncio.to_thread(
+                    _checkpoint, job_id, page, len(ids), saved, len(results) - saved, skipped, changes
+                )
+                if not ok:
+                    return  # 취소됐거나 다른 워커가 가져감
+                page += 1
+            await asyncio.to_thread(_set_status, job_id, "done", None, ("running",))
+        except asyncio.CancelledError:
+            # 앱 종료: 상태는 running 으로 두고 임대만 반납해서 재시작 시 바로 이어서 진행.
+            # 반납에 실패해도 임대가 만료되면 이어받으므로 취소는 그대로 전파함
+            try:
+                await asyncio.to_thread(_release, job_id)
+            except Exception:
+                logger.exception("크롤링 작업 임대 반납 실패: %s", job_id)
+            finally:
+                raise
+        except Exception as e:
+            await asyncio.to_thread(_set_status, job_id, "failed", str(e), ("running",))
+        finally:
+            self._tasks.pop(job_id, None)
+
+    async def resume_all(self) -> None:
+        """재시작 시 미완료 작업을 이어서 실행."""
+        def _active_ids():
+            with SessionLocal() as db:
+                stmt = select(CrawlJob.id).where(CrawlJob.status.in_(ACTIVE_STATUSES))
+                return db.execute(stmt).scalars().all()
+
+        for job_id in await asyncio.to_thread(_active_ids):
+            self.start(job_id)
+
+    async def watch(self) -> None:
+        """주기적으로 미완료 작업을 확인해서, 임대가 만료된(죽은 워커의) 작업을 이어받음."""
+        while True:
+            try:
+                await self.resume_all()
+            except Exception:
+                logger.exception("크롤링 작업 재개 실패")
+            await asyncio.sleep(max(1, CRAWL_JOB_LEASE_SECONDS // 2))
+
+    def start_watcher(self) -> None:
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self.watch())
+
+    async def cancel(self, job_id: uuid.UUID) -> bool:
+        changed = await asyncio.to_thread(_set_status, job_id, "cancelled", None, ACTIVE_STATUSES)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return changed
+
+    async def resume(self, job_id: uuid.UUID) -> bool:
+        changed = await asyncio.to_thread(_set_status, job_id, "pending", None, ("failed", "cancelled"))
+        if changed:
+            self.start(job_id)
+        return changed
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        if self._watcher is not None:
+            tasks.append(self._watcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+runner = CrawlJobRunner()
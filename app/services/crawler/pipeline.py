@@ -0,0 +1,235 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from app.utils import crawl
+from app.utils.crawl import parse_id_list, parse_law_response, save_law_data_batch
+from app.utils.metrics import LAW_API_REQUESTS, observe_stage
+
+load_dotenv()
+
+# 법령 API 호출 설정 (동시 요청 수 / 초당 요청 수 / 재시도)
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+CRAWL_RATE_LIMIT = float(os.getenv("CRAWL_RATE_LIMIT", "5"))  # 초당 요청 수, 0 이하면 제한 없음
+CRAWL_MAX_RETRIES = int(os.getenv("CRAWL_MAX_RETRIES", "3"))
+CRAWL_BACKOFF_BASE = float(os.getenv("CRAWL_BACKOFF_BASE", "0.5"))  # 초
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", "15"))
+CRAWL_MAX_CONNECTIONS = int(os.getenv("CRAWL_MAX_CONNECTIONS", "20"))
+CRAWL_SAVE_BATCH_SIZE = int(os.getenv("CRAWL_SAVE_BATCH_SIZE", "100"))
+
+# 저장 결과 표시용
+CHANGE_LABELS = {"inserted": "신규", "updated": "수정", "unchanged": "변경없음"}
+
+# 일시적인 장애로 보고 재시도하는 상태 코드
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """토큰 버킷 방식의 비동기 요청 속도 제한기."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """프로세스 전체에서 공유하는 커넥션 풀 클라이언트 (keep-alive 재사용)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=CRAWL_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=CRAWL_MAX_CONNECTIONS,
+                max_keepalive_connections=CRAWL_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+_limiter: Optional[RateLimiter] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_limiter() -> RateLimiter:
+    """프로세스 전체에서 공유하는 법령 API 속도 제한기 (요청/작업이 여러 개여도 합쳐서 CRAWL_RATE_LIMIT)."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(CRAWL_RATE_LIMIT)
+    return _limiter
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    """프로세스 전체에서 공유하는 동시 요청 수 제한 (CRAWL_CONCURRENCY)."""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, CRAWL_CONCURRENCY))
+    return _semaphore
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@dataclass
+class CrawlItemResult:
+    law_id: str
+    data: Optional[dict] = None
+    error: Optional[str] = None
+    save: Optional[dict] = None
+
+    @property
+    def saved(self) -> bool:
+        return bool(self.save and self.save.get("saved"))
+
+    @property
+    def status(self) -> Optional[str]:
+        """inserted / updated / unchanged (저장 실패면 None)."""
+        return self.save.get("status") if self.saved else None
+
+    def to_response(self) -> Dict:
+        p = self.data.get("PrecService") if isinstance(self.data, dict) else None
+        return {
+            "판례일련번호": self.law_id,
+            "사건명": p.get("사건명") if p else None,
+            "저장상태": "성공" if self.saved else "실패",
+            "변경": CHANGE_LABELS.get(self.status),
+        }
+
+
+class CrawlPipeline:
+    """판례 목록 -> 본문 조회 -> DB 저장을 비동기로 처리하는 수집 파이프라인.
+
+    base_url / list_url / client 를 주입하면 로컬 mock 서버로도 테스트할 수 있음.
+    속도 제한/동시성 제한은 기본적으로 프로세스 전체 공유 (get_limiter / get_semaphore).
+    concurrency / rate_limit (또는 limiter / semaphore) 를 주면 이 파이프라인 전용으로 따로 씀.
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        base_url: Optional[str] = None,
+        list_url: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        limiter: Optional[RateLimiter] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        max_retries: int = CRAWL_MAX_RETRIES,
+        backoff_base: float = CRAWL_BACKOFF_BASE,
+        save_batch_size: int = CRAWL_SAVE_BATCH_SIZE,
+    ):
+        self.client = client
+        self.base_url = base_url if base_url is not None else crawl.BASE_URL
+        self.list_url = list_url if list_url is not None else crawl.BASE_LIST_URL
+        if limiter is None and rate_limit is not None:
+            limiter = RateLimiter(rate_limit)
+        if semaphore is None and concurrency is not None:
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._limiter = limiter
+        self._semaphore = semaphore
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.save_batch_size = max(1, save_batch_size)
+
+    @property
+    def limiter(self) -> RateLimiter:
+        return self._limiter or get_limiter()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        return self._semaphore or get_semaphore()
+
+    async def _get(self, url: str) -> httpx.Response:
+        client = self.client or get_client()
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                try:
+                    resp = await client.get(url)
+                finally:
+                    # 재시도 대기/속도 제한 대기는 빼고 실제 호출 시간만 기록
+                    observe_stage("law_api", time.perf_counter() - started)
+                LAW_API_REQUESTS.inc(status=resp.status_code)
+                if resp.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    resp.raise_for_status()
+                    return resp
+                retry_after = resp.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+            except httpx.TransportError:
+                LAW_API_REQUESTS.inc(status="transport_error")
+                if attempt >= self.max_retries:
+                    raise
+                delay = None
+            # 지수 백오프 + 지터
+            if delay is None:
+                delay = self.backoff_base * (2 ** attempt) * (0.5 + random.random() / 2)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def fetch_list(self, keyword: str, page: int) -> List[str]:
+        resp = await self._get(f"{self.list_url}{keyword}&page={page}")
+        return parse_id_list(resp.json())
+
+    async def fetch(self, law_id: str) -> dict:
+        resp = await self._get(f"{self.base_url}{law_id}")
+        return parse_law_response(resp)
+
+    async def _process(self, law_id: str) -> CrawlItemResult:
+        async with self.semaphore:
+            result = CrawlItemResult(law_id=law_id)
+            try:
+                result.data = await self.fetch(law_id)
+            except Exception as e:
+                result.error = str(e)
+                result.save = {"saved": False, "reason": str(e)}
+            return result
+
+    async def save(self, results: List[CrawlItemResult]) -> None:
+        """조회에 성공한 항목을 배치 단위 upsert 로 저장."""
+        fetched = [r for r in results if r.error is None]
+        for start in range(0, len(fetched), self.save_batch_size):
+            chunk = fetched[start:start + self.save_batch_size]
+            # DB 저장은 동기 세션이라 스레드에서 실행 (이벤트 루프 블로킹 방지)
+            saves = await asyncio.to_thread(
+                save_law_data_batch, [r.data for r in chunk], [r.law_id for r in chunk]
+            )
+            for r, save in zip(chunk, saves):
+                r.save = save
+
+    async def crawl_ids(self, ids: List[str]) -> List[CrawlItemResult]:
+        results = list(await asyncio.gather(*(self._process(str(i)) for i in ids)))
+        await self.save(results)
+        return results
+
+    async def crawl_page(self, keyword: str, page: int) -> List[CrawlItemResult]:
+        ids = await self.fetch_list(keyword, page)
+        return await self.crawl_ids(ids)
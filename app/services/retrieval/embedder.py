@@ -0,0 +1,77 @@
+import os
+import threading
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# CPU 에서도 충분히 빠른 다국어(한국어 포함) 소형 임베딩 모델
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "intfloat/multilingual-e5-small")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_MAX_LENGTH = int(os.getenv("EMBEDDING_MAX_LENGTH", "512"))
+
+
+class Embedder:
+    """transformers 인코더 + mean pooling 으로 L2 정규화된 float32 임베딩을 만듦.
+
+    e5 계열 모델은 질의/문서 앞에 "query: " / "passage: " 접두사를 붙여야 성능이 나옴.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, device: str = "cpu"):
+        self.model_name = model_name
+        self.device = device
+        self._tokenizer = None
+        self._model = None
+        self._lock = threading.Lock()
+        self._use_prefix = "e5" in model_name.lower()
+
+    def _load(self) -> None:
+        if self._model is not None:
+            return
+        with self._lock:
+            if self._model is None:
+                from transformers import AutoModel, AutoTokenizer
+
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                model = AutoModel.from_pretrained(self.model_name)
+                model.eval()
+                self._model = model.to(self.device)
+
+    @property
+    def dim(self) -> int:
+        self._load()
+        return int(self._model.config.hidden_size)
+
+    def encode(self, texts: List[str], kind: str = "passage", batch_size: Optional[int] = None) -> np.ndarray:
+        """texts -> (len(texts), dim) float32 배열. kind 는 'query' 또는 'passage'."""
+        import torch
+
+        self._load()
+        if self._use_prefix:
+            texts = [f"{kind}: {t}" for t in texts]
+        batch_size = batch_size or EMBEDDING_BATCH_SIZE
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(texts), batch_size):
+                batch = self._tokenizer(
+                    texts[start:start + batch_size],
+                    padding=True, truncation=True, max_length=EMBEDDING_MAX_LENGTH, return_tensors="pt",
+                ).to(self.device)
+                hidden = self._model(**batch).last_hidden_state
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+                out[start:start + len(pooled)] = pooled.cpu().numpy()
+        return out
+
+
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    global _embedder
+    if _embedder is None:
+        _embedder = Embedder()
+    return _embedder
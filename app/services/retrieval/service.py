@@ -0,0 +1,165 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.model import Judgement, JudgementEmbedding
+from app.services.search.engine import get_search_engine
+from app.services.search.facets import SearchFilters
+from app.utils.crawl import register_save_listener
+from .embedder import get_embedder
+from .vector_index import VectorIndex
+
+load_dotenv()
+
+# 1 이면 임베딩 기반 검색 사용 (모델 다운로드 필요). 0 이면 n-gram 검색 엔진으로 대체.
+EMBEDDING_ENABLED = os.getenv("EMBEDDING_ENABLED", "0") == "1"
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
+EMBEDDING_LOAD_BATCH_SIZE = int(os.getenv("EMBEDDING_LOAD_BATCH_SIZE", "5000"))
+PASSAGE_MAX_CHARS = 2000  # 임베딩에 쓰는 본문 길이 (어차피 모델 입력 길이에서 잘림)
+
+VECTOR_DTYPE = np.dtype("<f2")  # DB/메모리 모두 float16 으로 저장해서 용량 절반
+
+
+def passage_text(row) -> str:
+    get = row.get if isinstance(row, dict) else lambda k: getattr(row, k)
+    parts = [get("case_name"), get("case_result_decision"), get("case_result_summary") or get("case_precedent")]
+    return "\n".join(p for p in parts if p)[:PASSAGE_MAX_CHARS]
+
+
+class SemanticRetriever:
+    """judgement_embeddings 를 메모리의 VectorIndex 로 올려서 top-k 검색."""
+
+    def __init__(self):
+        self.embedder = get_embedder()
+        self.index: Optional[VectorIndex] = None
+        self._lock = threading.Lock()
+
+    def _ensure_index(self, dim: int) -> VectorIndex:
+        if self.index is None:
+            self.index = VectorIndex(dim, dtype=VECTOR_DTYPE)
+        return self.index
+
+    def load(self, db: Session) -> None:
+        """DB 에 저장된 임베딩을 한 번에 메모리로 로드."""
+        with self._lock:
+            if self.index is not None:
+                return
+            index = VectorIndex(self.embedder.dim, dtype=VECTOR_DTYPE)
+            stmt = (
+                select(JudgementEmbedding.judgement_id, JudgementEmbedding.vector,
+                       Judgement.case_court, Judgement.case_type, Judgement.case_date)
+                .join(Judgement, Judgement.id == JudgementEmbedding.judgement_id)
+                .where(JudgementEmbedding.model_name == self.embedder.model_name)
+                .execution_options(yield_per=EMBEDDING_LOAD_BATCH_SIZE)
+            )
+            for chunk in db.execute(stmt).partitions():
+                index.add(
+                    [r.judgement_id for r in chunk],
+                    np.stack([np.frombuffer(r.vector, dtype=VECTOR_DTYPE) for r in chunk]),
+                    [r.case_court for r in chunk],
+                    [r.case_type for r in chunk],
+                    [r.case_date for r in chunk],
+                )
+            self.index = index
+
+    def index_rows(self, rows: List[Dict]) -> None:
+        """저장된 판례 행(dict, id 포함)을 배치로 임베딩해서 DB 와 메모리 인덱스에 반영."""
+        if not rows:
+            return
+        vectors = self.embedder.encode([passage_text(r) for r in rows], kind="passage")
+        with SessionLocal() as db:
+            stmt = pg_insert(JudgementEmbedding).values([
+                {
+                    "judgement_id": r["id"],
+                    "model_name": self.embedder.model_name,
+                    "dim": vectors.shape[1],
+                    "vector": v.astype(VECTOR_DTYPE).tobytes(),
+                }
+                for r, v in zip(rows, vectors)
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[JudgementEmbedding.judgement_id],
+                set_={"model_name": stmt.excluded.model_name, "dim": stmt.excluded.dim,
+                      "vector": stmt.excluded.vector},
+            ))
+            db.commit()
+        if self.index is not None:
+            self.index.add(
+                [r["id"] for r in rows], vectors,
+                [r.get("case_court") for r in rows], [r.get("case_type") for r in rows],
+                [r.get("case_date") for r in rows],
+            )
+
+    def backfill(self, db: Session, batch_size: int = 256) -> int:
+        """임베딩이 없는(또는 다른 모델로 만든) 판례를 배치로 임베딩. 처리 건수를 반환."""
+        done = 0
+        while True:
+            missing = (
+                select(Judgement)
+                .outerjoin(JudgementEmbedding, JudgementEmbedding.judgement_id == Judgement.id)
+                .where((JudgementEmbedding.judgement_id.is_(None))
+                       | (JudgementEmbedding.model_name != self.embedder.model_name))
+                .limit(batch_size)
+            )
+            items = db.execute(missing).scalars().all()
+            if not items:
+                return done
+            self.index_rows([
+                {"id": j.id, "case_name": j.case_name, "case_result_decision": j.case_result_decision,
+                 "case_result_summary": j.case_result_summary, "case_precedent": j.case_precedent,
+                 "case_court": j.case_court, "case_type": j.case_type, "case_date": j.case_date}
+                for j in items
+            ])
+            done += len(items)
+
+    def search(self, db: Session, query: str, k: int, **filters) -> List[tuple]:
+        if self.index is None:
+            self.load(db)
+        vector = self.embedder.encode([query], kind="query")[0]
+        return self.index.search(vector, k, **filters)
+
+
+_retriever: Optional[SemanticRetriever] = None
+
+
+def get_retriever() -> SemanticRetriever:
+    global _retriever
+    if _retriever is None:
+        _retriever = SemanticRetriever()
+    return _retriever
+
+
+def retrieve(db: Session, query: str, k: int = RETRIEVAL_TOP_K, court: Optional[str] = None,
+             case_type: Optional[str] = None, date_from=None, date_to=None) -> List[Judgement]:
+    """챗봇 컨텍스트용 상위 k 개 판례. 임베딩이 꺼져 있으면 n-gram 검색 결과를 사용."""
+    filters = {"court": court, "case_type": case_type, "date_from": date_from, "date_to": date_to}
+    if EMBEDDING_ENABLED:
+        hits = get_retriever().search(db, query, k, **filters)
+        if not hits:
+            return []
+        ids = [doc_id for doc_id, _ in hits]
+        rows = {r.id: r for r in db.execute(select(Judgement).where(Judgement.id.in_(ids))).scalars()}
+        return [rows[i] for i in ids if i in rows]
+
+    # fallback: n-gram 색인에서 질문 토큰 OR 매칭 + 관련도 순 (필터는 쿼리 안에서)
+    return get_search_engine().retrieve(
+        db, query, k, SearchFilters(court=court, case_type=case_type, date_from=date_from, date_to=date_to)
+    )
+
+
+if EMBEDDING_ENABLED:
+    # 저장(크롤링) 시점에 배치로 임베딩 계산
+    register_save_listener(lambda rows: get_retriever().index_rows(rows))
+
+
+if __name__ == "__main__":
+    # 기존 판례 임베딩: EMBEDDING_ENABLED=1 python -m app.services.retrieval.service
+    with SessionLocal() as db:
+        print(f"{get_retriever().backfill(db)}건 임베딩 완료")
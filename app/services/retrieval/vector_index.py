@@ -0,0 +1,114 @@
+import threading
+from datetime import date, datetime
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 연속된 (N, dim) 배열에 벡터를 모아두고 행렬곱 한 번으로 top-k 를 구하는 brute-force 인덱스.
+# 수십만 건 x 384차원 정도는 CPU 에서도 수 ms~수십 ms 안에 검색됨.
+
+SEARCH_CHUNK_ROWS = 65536  # float16 저장 시 청크 단위로 float32 변환해서 계산
+
+
+def _day(value) -> int:
+    if value is None:
+        return -1
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() if isinstance(value, date) else -1
+
+
+class VectorIndex:
+    def __init__(self, dim: int, dtype=np.float16, capacity: int = 1024):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self._vectors = np.zeros((capacity, dim), dtype=self.dtype)
+        self._court = np.full(capacity, -1, dtype=np.int32)
+        self._type = np.full(capacity, -1, dtype=np.int32)
+        self._day = np.full(capacity, -1, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._ids: List[Optional[Hashable]] = [None] * capacity
+        self._row_of: Dict[Hashable, int] = {}
+        self._size = 0
+        # 법원명/사건종류 문자열 -> 정수 코드 (필터를 벡터 연산으로 처리하기 위함)
+        self._codes: Dict[str, Dict[str, int]] = {"court": {}, "type": {}}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _code(self, field: str, value: Optional[str], create: bool) -> int:
+        if value is None:
+            return -1
+        codes = self._codes[field]
+        if value not in codes:
+            if not create:
+                return -2  # 색인에 없는 값 -> 아무것도 매칭되지 않음
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        extra = new_capacity - capacity
+        self._vectors = np.concatenate([self._vectors, np.zeros((extra, self.dim), dtype=self.dtype)])
+        self._court = np.concatenate([self._court, np.full(extra, -1, dtype=np.int32)])
+        self._type = np.concatenate([self._type, np.full(extra, -1, dtype=np.int32)])
+        self._day = np.concatenate([self._day, np.full(extra, -1, dtype=np.int32)])
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        self._ids.extend([None] * extra)
+
+    def add(self, ids: Sequence[Hashable], vectors: np.ndarray, courts: Sequence[Optional[str]],
+            types: Sequence[Optional[str]], dates: Sequence) -> None:
+        """벡터 일괄 추가. 이미 있는 id 면 같은 행을 덮어씀."""
+        with self._lock:
+            new_ids = [i for i in ids if i not in self._row_of]
+            self._grow(self._size + len(new_ids))
+            for doc_id, vector, court, type_, day in zip(ids, vectors, courts, types, dates):
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row_of[doc_id] = row
+                    self._ids[row] = doc_id
+                self._vectors[row] = vector
+                self._court[row] = self._code("court", court, True)
+                self._type[row] = self._code("type", type_, True)
+                self._day[row] = _day(day)
+                self._alive[row] = True
+
+    def remove(self, doc_id: Hashable) -> None:
+        with self._lock:
+            row = self._row_of.pop(doc_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._ids[row] = None
+
+    def search(self, query: np.ndarray, k: int, court: Optional[str] = None, case_type: Optional[str] = None,
+               date_from=None, date_to=None) -> List[Tuple[Hashable, float]]:
+        """코사인 유사도 top-k. 법원/사건종류/선고일 범위는 유사도 계산 전에 마스크로 걸러냄."""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        with self._lock:
+            n = self._size
+            mask = self._alive[:n].copy()
+            if court is not None:
+                mask &= self._court[:n] == self._code("court", court, False)
+            if case_type is not None:
+                mask &= self._type[:n] == self._code("type", case_type, False)
+            if date_from is not None:
+                mask &= self._day[:n] >= _day(date_from)
+            if date_to is not None:
+                mask &= self._day[:n] <= _day(date_to)
+            rows = np.flatnonzero(mask)
+            if rows.size == 0 or k <= 0:
+                return []
+            scores = np.empty(rows.size, dtype=np.float32)
+            for start in range(0, rows.size, SEARCH_CHUNK_ROWS):
+                chunk = rows[start:start + SEARCH_CHUNK_ROWS]
+                scores[start:start + chunk.size] = self._vectors[chunk].astype(np.float32) @ query
+            k = min(k, rows.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[rows[i]], float(scores[i])) for i in top]
@@ -0,0 +1,196 @@
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from app.models.model import Judgement
+from app.utils.cache import TTLCache
+from app.utils.crawl import register_save_listener
+
+load_dotenv()
+
+# 판례 상세/요약 캐시 (사건번호 기준). 인기 판례는 DB를 거치지 않고 응답함.
+RULING_CACHE_SIZE = int(os.getenv("RULING_CACHE_SIZE", "2048"))
+RULING_CACHE_TTL = float(os.getenv("RULING_CACHE_TTL", "600"))
+# 여러 워커가 공유하는 캐시 (예: redis://localhost:6379/0). 설정하면 로컬 캐시는 짧게만 유지.
+RULING_CACHE_URL = os.getenv("RULING_CACHE_URL")
+RULING_CACHE_LOCAL_TTL = float(os.getenv("RULING_CACHE_LOCAL_TTL", "5"))
+
+
+def ruling_to_dict(obj: Judgement) -> Dict:
+    return {
+        "id": obj.id,
+        "case_number": obj.case_number,
+        "case_name": obj.case_name,
+        "case_date": obj.case_date,
+        "case_result": obj.case_result,
+        "case_court": obj.case_court,
+        "case_court_code": obj.case_court_code,
+        "case_type": obj.case_type,
+        "case_type_code": obj.case_type_code,
+        "case_result_type": obj.case_result_type,
+        "case_result_decision": obj.case_result_decision,
+        "case_result_summary": obj.case_result_summary,
+        "reference": obj.reference,
+        "reference_case": obj.reference_case,
+        "case_precedent": obj.case_precedent,
+    }
+
+
+def make_entry(obj: Judgement) -> Dict:
+    """캐시에 저장할 값: JSON 변환된 상세 데이터 + ETag/Last-Modified."""
+    modified = obj.updated_at or obj.created_at or datetime.now()
+    return {
+        "data": jsonable_encoder(ruling_to_dict(obj)),
+        "etag": f'W/"{obj.id}-{int(modified.timestamp() * 1000)}"',
+        "last_modified": format_datetime(modified.astimezone(timezone.utc), usegmt=True),
+    }
+
+
+def is_not_modified(entry: Dict, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """조건부 요청(If-None-Match / If-Modified-Since)에 304 로 응답할 수 있는지."""
+    if if_none_match:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or entry["etag"] in tags
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            modified = parsedate_to_datetime(entry["last_modified"])
+            return modified.replace(microsecond=0) <= since
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class RedisBackend:
+    """여러 워커/서버가 공유하는 캐시. redis 패키지가 있을 때만 사용 가능."""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "ruling:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RULING_CACHE_URL 을 쓰려면 redis 패키지를 설치하세요.") from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        # MGET 한 번으로 조회
+        raws = self.client.mget([self.prefix + key for key in keys])
+        return {key: json.loads(raw) for key, raw in zip(keys, raws) if raw}
+
+    def set(self, key: str, value: Dict) -> None:
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=int(self.ttl))
+
+    def set_many(self, values: Dict[str, Dict]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=int(self.ttl))
+        pipe.execute()
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+class RulingCache:
+    """로컬 LRU+TTL 캐시 + (선택) 공유 백엔드로 구성된 read-through 캐시.
+
+    공유 백엔드(redis) 호출은 블로킹이라 async 라우터에서는 aget/aset 계열을 사용함
+    (로컬 캐시에 있으면 바로 반환하고, 공유 백엔드만 스레드풀에서 호출).
+    """
+
+    def __init__(self, local: TTLCache, shared=None):
+        self.local = local
+        self.shared = shared
+
+    def get(self, case_number: str) -> Optional[Dict]:
+        entry = self.local.get(case_number)
+        if entry is None and self.shared is not None:
+            try:
+                entry = self.shared.get(case_number)
+            except Exception as e:
+                print(f"⚠️  공유 캐시 조회 실패: {e}")
+            if entry is not None:
+                self.local.set(case_number, entry)
+        return entry
+
+    def set(self, case_number: str, entry: Dict) -> None:
+        self.local.set(case_number, entry)
+        if self.shared is not None:
+            try:
+                self.shared.set(case_number, entry)
+            except Exception as e:
+                print(f"⚠️  공유 캐시 저장 실패: {e}")
+
+    async def aget(self, case_number: str) -> Optional[Dict]:
+        entry = self.local.get(case_number)
+        if entry is None and self.shared is not None:
+            entry = await run_in_threadpool(self.get, case_number)
+        return entry
+
+    async def aset(self, case_number: str, entry: Dict) -> None:
+        if self.shared is None:
+            self.local.set(case_number, entry)
+        else:
+            await run_in_threadpool(self.set, case_number, entry)
+
+    async def aget_many(self, case_numbers: List[str]) -> Dict[str, Dict]:
+        """여러 사건번호를 조회. 로컬에 없는 것만 공유 백엔드에 한 번에 물어봄."""
+        entries = {}
+        for case_number in case_numbers:
+            entry = self.local.get(case_number)
+            if entry is not None:
+                entries[case_number] = entry
+        misses = [c for c in case_numbers if c not in entries]
+        if misses and self.shared is not None:
+            try:
+                found = await run_in_threadpool(self.shared.get_many, misses)
+            except Exception as e:
+                print(f"⚠️  공유 캐시 조회 실패: {e}")
+                found = {}
+            for case_number, entry in found.items():
+                self.local.set(case_number, entry)
+            entries.update(found)
+        return entries
+
+    async def aset_many(self, entries: Dict[str, Dict]) -> None:
+        for case_number, entry in entries.items():
+            self.local.set(case_number, entry)
+        if entries and self.shared is not None:
+            try:
+                await run_in_threadpool(self.shared.set_many, entries)
+            except Exception as e:
+                print(f"⚠️  공유 캐시 저장 실패: {e}")
+
+    def invalidate(self, case_numbers: Iterable[str]) -> None:
+        for case_number in case_numbers:
+            self.local.delete(case_number)
+            if self.shared is not None:
+                try:
+                    self.shared.delete(case_number)
+                except Exception as e:
+                    print(f"⚠️  공유 캐시 삭제 실패: {e}")
+
+
+def _build_cache() -> RulingCache:
+    if RULING_CACHE_URL:
+        return RulingCache(
+            TTLCache(maxsize=RULING_CACHE_SIZE, ttl=RULING_CACHE_LOCAL_TTL),
+            RedisBackend(RULING_CACHE_URL, RULING_CACHE_TTL),
+        )
+    return RulingCache(TTLCache(maxsize=RULING_CACHE_SIZE, ttl=RULING_CACHE_TTL))
+
+
+ruling_cache = _build_cache()
+
+# 크롤링/배치 저장으로 판례가 바뀌면 해당 사건번호 캐시를 비움
+register_save_listener(lambda rows: ruling_cache.invalidate(row["case_number"] for row in rows))
@@ -0,0 +1,291 @@
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event, func, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.model import Judgement, search_vector_expr
+from app.utils.crawl import register_save_listener
+from .facets import SearchFilters
+from .memory_index import InMemorySearchIndex
+from .pagination import SEARCH_TOTAL_MODE, count_matches, decode_cursor, encode_cursor
+from .tokenizer import NGRAM_SIZE, query_terms
+
+load_dotenv()
+
+# postgres: tsvector + GIN 인덱스 / memory: 순수 파이썬 역색인 (확장 없는 DB, 테스트용)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "postgres")
+BACKFILL_BATCH_SIZE = int(os.getenv("SEARCH_BACKFILL_BATCH_SIZE", "500"))
+
+
+@dataclass
+class SearchResult:
+    items: List[Judgement]
+    total: Optional[int]
+    total_exact: bool = True
+    scores: List[Optional[float]] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def to_tsquery_text(q: str, match_all: bool = True) -> str:
+    """검색어 -> tsquery 문자열. 모든 n-gram을 AND로 묶고, 짧은 토큰은 접두사 검색.
+
+    match_all=False 면 OR 로 묶음 (문장형 질문용). 이때 짧은 토큰의 접두사 검색은 거의 모든 문서에
+    걸리므로 n-gram 이 하나도 없을 때만 씀.
+    """
+    terms = query_terms(q)
+    if not match_all and any(len(t) >= NGRAM_SIZE for t in terms):
+        terms = [t for t in terms if len(t) >= NGRAM_SIZE]
+    parts = [f"'{term}'" if len(term) >= NGRAM_SIZE else f"'{term}':*" for term in terms]
+    return (" & " if match_all else " | ").join(parts)
+
+
+def _apply_filters(stmt, filters: Optional[SearchFilters]):
+    return stmt.where(*filters.conditions()) if filters else stmt
+
+
+class _SearchEngine(ABC):
+    """검색 엔진 공통 로직. 하위 클래스는 condition() 과 search() 를 구현."""
+
+    @abstractmethod
+    def condition(self, db: Session, q: str):
+        """검색어 매칭 WHERE 절. 검색어가 비어 있으면 None (전체)."""
+
+    @abstractmethod
+    def search(self, db: Session, q: str, limit: int, offset: int = 0,
+               total_mode: str = SEARCH_TOTAL_MODE, filters: Optional[SearchFilters] = None) -> SearchResult:
+        """관련도 순 + limit/offset 페이지."""
+
+    @abstractmethod
+    def retrieve(self, db: Session, q: str, k: int, filters: Optional[SearchFilters] = None) -> List[Judgement]:
+        """챗봇 컨텍스트용 상위 k 개. 문장형 질문이라 토큰 중 하나라도 맞으면 후보로 보고(OR) 관련도 순."""
+
+    def _base_stmt(self, db: Session, q: str, filters: Optional[SearchFilters] = None):
+        cond = self.condition(db, q)
+        stmt = _apply_filters(select(Judgement), filters)
+        return stmt if cond is None else stmt.where(cond)
+
+    def count(self, db: Session, q: str, stmt, total_mode: str, filters: Optional[SearchFilters] = None):
+        cache_key = (q, filters.key()) if filters else q
+        return count_matches(db, stmt, total_mode, cache_key=cache_key)
+
+    def _latest(self, db: Session, q: str, limit: int, offset: int, total_mode: str,
+                filters: Optional[SearchFilters] = None) -> SearchResult:
+        # 검색어가 없으면 최신 판례 순으로 전체 목록 (필터가 있으면 복합 인덱스로 바로 읽음)
+        stmt = _apply_filters(select(Judgement), filters)
+        total, exact = self.count(db, q, stmt, total_mode, filters)
+        items = db.execute(
+            stmt.order_by(Judgement.case_date.desc(), Judgement.id.desc()).limit(limit).offset(offset)
+        ).scalars().all()
+        return SearchResult(items=items, total=total, total_exact=exact, scores=[None] * len(items))
+
+    def search_after(self, db: Session, q: str, limit: int, cursor: Optional[str] = None,
+                     total_mode: str = SEARCH_TOTAL_MODE, filters: Optional[SearchFilters] = None) -> SearchResult:
+        """(case_date, id) 키셋 페이지네이션. 최신순이며 offset 과 달리 깊은 페이지도 비용이 일정함."""
+        stmt = self._base_stmt(db, q, filters)
+        # total 은 첫 페이지에서만 계산 (다음 페이지부터는 클라이언트가 이미 알고 있음)
+        total, exact = (None, False) if cursor else self.count(db, q, stmt, total_mode, filters)
+        if cursor:
+            case_date, judgement_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(Judgement.case_date, Judgement.id) < tuple_(case_date, judgement_id))
+        stmt = stmt.order_by(Judgement.case_date.desc(), Judgement.id.desc()).limit(limit + 1)
+        items = db.execute(stmt).scalars().all()
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].case_date, items[-1].id)
+        return SearchResult(items=items, total=total, total_exact=exact,
+                            scores=[None] * len(items), next_cursor=next_cursor)
+
+
+class PostgresSearchEngine(_SearchEngine):
+    """judgements.search_vector(GIN) 를 이용한 색인 검색 + ts_rank_cd 랭킹."""
+
+    def _tsquery(self, q: str, match_all: bool = True):
+        tsquery_text = to_tsquery_text(q, match_all)
+        return func.to_tsquery("simple", tsquery_text) if tsquery_text else None
+
+    def condition(self, db: Session, q: str):
+        tsquery = self._tsquery(q)
+        return None if tsquery is None else Judgement.search_vector.op("@@")(tsquery)
+
+    def search(self, db: Session, q: str, limit: int, offset: int = 0,
+               total_mode: str = SEARCH_TOTAL_MODE, filters: Optional[SearchFilters] = None) -> SearchResult:
+        tsquery = self._tsquery(q)
+        if tsquery is None:
+            return self._latest(db, q, limit, offset, total_mode, filters)
+
+        cond = Judgement.search_vector.op("@@")(tsquery)
+        filter_conds = filters.conditions() if filters else []
+        # normalization 32: rank / (rank + 1) -> 0~1 사이 점수
+        rank = func.ts_rank_cd(Judgement.search_vector, tsquery, 32).label("rank")
+        stmt = (
+            select(Judgement, rank)
+            .where(cond, *filter_conds)
+            .order_by(rank.desc(), Judgement.case_date.desc(), Judgement.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = db.execute(stmt).all()
+        total, exact = self.count(db, q, select(Judgement).where(cond, *filter_conds), total_mode, filters)
+        return SearchResult(items=[r[0] for r in rows], total=total, total_exact=exact,
+                            scores=[float(r[1]) for r in rows])
+
+    def retrieve(self, db: Session, q: str, k: int, filters: Optional[SearchFilters] = None) -> List[Judgement]:
+        tsquery = self._tsquery(q, match_all=False)
+        if tsquery is None:
+            return self._latest(db, q, k, 0, "none", filters).items
+        # 겹치는 n-gram 이 많을수록 ts_rank_cd 가 높음. 필터는 같은 쿼리 안에서 걸어서 k 개를 채움
+        rank = func.ts_rank_cd(Judgement.search_vector, tsquery, 32)
+        stmt = (
+            _apply_filters(select(Judgement), filters)
+            .where(Judgement.search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), Judgement.case_date.desc(), Judgement.id.desc())
+            .limit(k)
+        )
+        return db.execute(stmt).scalars().all()
+
+
+class MemorySearchEngine(_SearchEngine):
+    """순수 파이썬 역색인 기반 검색. 최초 검색 시 DB 전체를 한 번 색인하고 이후 저장 이벤트로 갱신."""
+
+    def __init__(self):
+        self.index = InMemorySearchIndex()
+        self._loaded = False
+        event.listen(Judgement, "after_insert", self._on_saved)
+        event.listen(Judgement, "after_update", self._on_saved)
+        event.listen(Judgement, "after_delete", self._on_deleted)
+        # 배치 upsert 는 ORM 이벤트를 거치지 않으므로 저장 콜백으로 갱신
+        register_save_listener(self._on_batch_saved)
+
+    def _on_batch_saved(self, rows):
+        if self._loaded:
+            for row in rows:
+                self.index.add(row["id"], row["case_name"], row["case_precedent"])
+
+    def _on_saved(self, mapper, connection, target):
+        if self._loaded:
+            self.index.add(target.id, target.case_name, target.case_precedent)
+
+    def _on_deleted(self, mapper, connection, target):
+        self.index.remove(target.id)
+
+    def rebuild(self, db: Session) -> None:
+        stmt = select(Judgement.id, Judgement.case_name, Judgement.case_precedent)
+        for row in db.execute(stmt.execution_options(yield_per=BACKFILL_BATCH_SIZE)):
+            self.index.add(row.id, row.case_name, row.case_precedent)
+        self._loaded = True
+
+    def _hits(self, db: Session, q: str, match_all: bool = True):
+        if not self._loaded:
+            self.rebuild(db)
+        return self.index.search(q, match_all)
+
+    def condition(self, db: Session, q: str):
+        if not query_terms(q):
+            return None
+        return Judgement.id.in_([doc_id for doc_id, _ in self._hits(db, q)])
+
+    def _filtered_hits(self, db: Session, q: str, filters: Optional[SearchFilters], match_all: bool = True):
+        hits = self._hits(db, q, match_all)
+        if not filters or not hits:
+            return hits
+        # 역색인은 패싯 값을 모르므로 매칭된 id 중 필터를 통과하는 것만 DB 에서 골라냄 (순서는 유지)
+        allowed = set(db.execute(
+            select(Judgement.id).where(Judgement.id.in_([doc_id for doc_id, _ in hits]), *filters.conditions())
+        ).scalars())
+        return [(doc_id, score) for doc_id, score in hits if doc_id in allowed]
+
+    def count(self, db: Session, q: str, stmt, total_mode: str, filters: Optional[SearchFilters] = None):
+        if total_mode == "none":
+            return None, False
+        # 역색인에서는 매칭 건수가 이미 계산되어 있으므로 항상 정확한 값
+        if not query_terms(q):
+            return super().count(db, q, stmt, total_mode, filters)
+        return len(self._filtered_hits(db, q, filters)), True
+
+    def search(self, db: Session, q: str, limit: int, offset: int = 0,
+               total_mode: str = SEARCH_TOTAL_MODE, filters: Optional[SearchFilters] = None) -> SearchResult:
+        if not query_terms(q):
+            return self._latest(db, q, limit, offset, total_mode, filters)
+        hits = self._filtered_hits(db, q, filters)
+        page = hits[offset:offset + limit]
+        rows = {}
+        if page:
+            ids = [doc_id for doc_id, _ in page]
+            rows = {r.id: r for r in db.execute(select(Judgement).where(Judgement.id.in_(ids))).scalars()}
+        items, scores = [], []
+        for doc_id, score in page:
+            if doc_id in rows:
+                items.append(rows[doc_id])
+                scores.append(score)
+        total, exact = (None, False) if total_mode == "none" else (len(hits), True)
+        return SearchResult(items=items, total=total, total_exact=exact, scores=scores)
+
+    def retrieve(self, db: Session, q: str, k: int, filters: Optional[SearchFilters] = None) -> List[Judgement]:
+        if not query_terms(q):
+            return self._latest(db, q, k, 0, "none", filters).items
+        # 필터는 전체 매칭 결과에 걸고 나서 k 개를 자름 (상위 몇 개만 거르면 k 개가 안 될 수 있음)
+        ids = [doc_id for doc_id, _ in self._filtered_hits(db, q, filters, match_all=False)[:k]]
+        if not ids:
+            return []
+        rows = {r.id: r for r in db.execute(select(Judgement).where(Judgement.id.in_(ids))).scalars()}
+        return [rows[i] for i in ids if i in rows]
+
+
+_engine = None
+
+
+def get_search_engine():
+    global _engine
+    if _engine is None:
+        _engine = MemorySearchEngine() if SEARCH_BACKEND == "memory" else PostgresSearchEngine()
+    return _engine
+
+
+def ensure_search_schema(bind) -> None:
+    """create_all 은 기존 테이블에 컬럼을 추가하지 않으므로, 이미 배포된 DB를 위해 직접 보강."""
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.begin() as conn:
+        conn.execute(text("ALTER TABLE judgements ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_judgements_search_vector "
+            "ON judgements USING gin (search_vector)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_judgements_date_id ON judgements (case_date, id)"
+        ))
+
+
+def backfill_search_vectors(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """search_vector 가 비어 있는 기존 판례를 배치 단위로 색인. 처리한 건수를 반환."""
+    done = 0
+    while True:
+        rows = db.execute(
+            select(Judgement.id, Judgement.case_name, Judgement.case_precedent)
+            .where(Judgement.search_vector.is_(None))
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return done
+        for row in rows:
+            db.execute(
+                Judgement.__table__.update()
+                .where(Judgement.id == row.id)
+                .values(search_vector=search_vector_expr(row.case_name, row.case_precedent))
+            )
+        db.commit()
+        done += len(rows)
+
+
+if __name__ == "__main__":
+    # 기존 데이터 색인: python -m app.services.search.engine
+    from app.db import SessionLocal, engine
+
+    ensure_search_schema(engine)
+    with SessionLocal() as db:
+        print(f"{backfill_search_vectors(db)}건 색인 완료")
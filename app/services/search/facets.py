@@ -0,0 +1,231 @@
+import os
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import extract, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.model import Judgement, JudgementFacetCount
+
+load_dotenv()
+
+# 패싯별로 돌려줄 최대 항목 수
+SEARCH_FACET_LIMIT = int(os.getenv("SEARCH_FACET_LIMIT", "50"))
+
+FACETS = ("court", "case_type", "result_type", "year")
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """검색 필터 (법원, 사건종류, 판결유형, 선고연도/선고일 범위). 값이 None 이면 해당 필터 없음."""
+    court: Optional[str] = None
+    case_type: Optional[str] = None
+    result_type: Optional[str] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f.name) is not None for f in fields(self))
+
+    def key(self) -> tuple:
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def conditions(self, exclude: Optional[str] = None) -> list:
+        """judgements 에 걸 WHERE 조건 목록. exclude 패싯의 필터는 뺌 (그 패싯의 다른 값 개수를 보여주기 위해)."""
+        conds = []
+        if self.court is not None and exclude != "court":
+            conds.append(Judgement.case_court == self.court)
+        if self.case_type is not None and exclude != "case_type":
+            conds.append(Judgement.case_type == self.case_type)
+        if self.result_type is not None and exclude != "result_type":
+            conds.append(Judgement.case_result_type == self.result_type)
+        if exclude != "year":
+            # 연도 대신 날짜 범위로 걸어야 (case_date, id) 인덱스를 탐
+            if self.year_from is not None:
+                conds.append(Judgement.case_date >= datetime(self.year_from, 1, 1))
+            if self.year_to is not None:
+                conds.append(Judgement.case_date < datetime(self.year_to + 1, 1, 1))
+            if self.date_from is not None:
+                conds.append(Judgement.case_date >= self.date_from)
+            if self.date_to is not None:
+                # case_date 는 DateTime 이라 끝 날짜 당일 전체를 포함
+                conds.append(Judgement.case_date < self.date_to + timedelta(days=1))
+        return conds
+
+    @property
+    def aggregatable(self) -> bool:
+        """집계 표(연도 단위)로 셀 수 있는 필터인지. 날짜 범위는 연도보다 세밀해서 불가."""
+        return self.date_from is None and self.date_to is None
+
+    def count_conditions(self, exclude: Optional[str] = None) -> list:
+        """judgement_facet_counts 에 걸 WHERE 조건 목록."""
+        t = JudgementFacetCount
+        conds = []
+        if self.court is not None and exclude != "court":
+            conds.append(t.court == self.court)
+        if self.case_type is not None and exclude != "case_type":
+            conds.append(t.case_type == self.case_type)
+        if self.result_type is not None and exclude != "result_type":
+            conds.append(t.result_type == self.result_type)
+        if exclude != "year":
+            if self.year_from is not None:
+                conds.append(t.year >= self.year_from)
+            if self.year_to is not None:
+                conds.append(t.year <= self.year_to)
+        return conds
+
+
+def _judgement_column(facet: str):
+    return {
+        "court": Judgement.case_court,
+        "case_type": Judgement.case_type,
+        "result_type": Judgement.case_result_type,
+        "year": extract("year", Judgement.case_date),
+    }[facet]
+
+
+def _count_column(facet: str):
+    return getattr(JudgementFacetCount, facet)
+
+
+def _buckets(rows, facet: str) -> List[Dict]:
+    buckets = []
+    for value, count in rows:
+        if facet == "year" and value is not None:
+            value = int(value)
+        # 집계 표에는 빈 값이 '' 로 저장되어 있음
+        buckets.append({"value": value if value != "" else None, "count": int(count)})
+    return buckets
+
+
+def facet_counts(db: Session, search_engine, q: str, filters: Optional[SearchFilters] = None,
+                 limit: int = SEARCH_FACET_LIMIT) -> Dict[str, List[Dict]]:
+    """패싯별 [{value, count}] (많은 순, 연도는 최신순).
+
+    검색어가 없으면 집계 표(judgement_facet_counts)만 합산하고, 검색어가 있으면 매칭된 판례만 GROUP BY 함.
+    각 패싯의 개수는 그 패싯 자신의 필터를 뺀 나머지 필터 기준 (다른 값으로 바꿨을 때의 개수).
+    """
+    filters = filters or SearchFilters()
+    cond = search_engine.condition(db, q)
+    use_aggregate = cond is None and filters.aggregatable and db.get_bind().dialect.name == "postgresql"
+    result = {}
+    for facet in FACETS:
+        if use_aggregate:
+            column = _count_column(facet)
+            total = func.sum(JudgementFacetCount.count)
+            stmt = (
+                select(column, total)
+                .where(*filters.count_conditions(exclude=facet))
+                .group_by(column)
+                .having(total > 0)
+            )
+        else:
+            column = _judgement_column(facet)
+            total = func.count()
+            stmt = select(column, total).where(*filters.conditions(exclude=facet))
+            if cond is not None:
+                stmt = stmt.where(cond)
+            stmt = stmt.group_by(column)
+        order = column.desc() if facet == "year" else total.desc()
+        rows = db.execute(stmt.order_by(order).limit(limit)).all()
+        result[facet] = _buckets(rows, facet)
+    return result
+
+
+# judgements 가 바뀔 때마다 문장(statement) 단위로 조합별 증감분만 반영하는 트리거.
+# 배치 upsert / COPY 병합처럼 한 문장에 수천 행이 바뀌어도 집계 표는 조합 수만큼만 갱신됨.
+_FACET_KEY = (
+    "coalesce(case_court, ''), coalesce(case_type, ''), coalesce(case_result_type, ''), "
+    "extract(year from case_date)::int"
+)
+
+_FACET_TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION judgement_facet_counts_apply() RETURNS trigger AS $$
+BEGIN
+    -- 키 순서대로 갱신해서 동시에 저장하는 트랜잭션끼리 데드락이 나지 않게 함
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO judgement_facet_counts (court, case_type, result_type, year, count)
+        SELECT {_FACET_KEY}, count(*) FROM new_rows GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4
+        ON CONFLICT (court, case_type, result_type, year)
+        DO UPDATE SET count = judgement_facet_counts.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO judgement_facet_counts (court, case_type, result_type, year, count)
+        SELECT {_FACET_KEY}, -count(*) FROM old_rows GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4
+        ON CONFLICT (court, case_type, result_type, year)
+        DO UPDATE SET count = judgement_facet_counts.count + EXCLUDED.count;
+    ELSE
+        -- 수정은 패싯 값이 바뀐 조합만 반영 (재수집으로 본문만 바뀌면 아무 것도 쓰지 않음)
+        INSERT INTO judgement_facet_counts (court, case_type, result_type, year, count)
+        SELECT c, t, r, y, sum(delta) FROM (
+            SELECT {_FACET_KEY}, -1 FROM old_rows
+            UNION ALL
+            SELECT {_FACET_KEY}, 1 FROM new_rows
+        ) AS changes (c, t, r, y, delta)
+        GROUP BY 1, 2, 3, 4 HAVING sum(delta) <> 0 ORDER BY 1, 2, 3, 4
+        ON CONFLICT (court, case_type, result_type, year)
+        DO UPDATE SET count = judgement_facet_counts.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# 전이 테이블(REFERENCING)은 이벤트 하나당 트리거 하나만 가능
+_FACET_TRIGGERS = {
+    "judgement_facet_counts_insert": "AFTER INSERT ON judgements REFERENCING NEW TABLE AS new_rows",
+    "judgement_facet_counts_update": (
+        "AFTER UPDATE ON judgements REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "judgement_facet_counts_delete": "AFTER DELETE ON judgements REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def rebuild_facet_counts(conn) -> None:
+    """집계 표를 judgements 전체 GROUP BY 로 다시 만듦. 그동안 judgements 쓰기는 잠시 대기."""
+    conn.execute(text("LOCK TABLE judgements IN SHARE MODE"))
+    conn.execute(text("DELETE FROM judgement_facet_counts"))
+    conn.execute(text(
+        "INSERT INTO judgement_facet_counts (court, case_type, result_type, year, count) "
+        f"SELECT {_FACET_KEY}, count(*) FROM judgements GROUP BY 1, 2, 3, 4"
+    ))
+
+
+# 워커 여러 개가 동시에 시작할 때 스키마 보강을 한 번에 하나씩 하기 위한 advisory lock 키
+FACET_SCHEMA_LOCK_KEY = 7_301_019
+
+
+def ensure_facet_schema(bind) -> None:
+    """패싯 집계 트리거 + 필터용 복합 인덱스를 만들고, 집계 표가 비어 있으면 처음 한 번 채움."""
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.begin() as conn:
+        # 트랜잭션이 끝나면 자동 해제. 뒤에 온 워커는 앞 워커가 채운 집계 표를 보고 재계산을 건너뜀
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": FACET_SCHEMA_LOCK_KEY})
+        for name, column in (("court", "case_court"), ("type", "case_type"), ("result_type", "case_result_type")):
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_judgements_{name}_date_id ON judgements ({column}, case_date, id)"
+            ))
+        conn.execute(text(_FACET_TRIGGER_FUNCTION))
+        for name, timing in _FACET_TRIGGERS.items():
+            # DROP + CREATE 대신 교체 (Postgres 14+)
+            conn.execute(text(
+                f"CREATE OR REPLACE TRIGGER {name} {timing} "
+                "FOR EACH STATEMENT EXECUTE FUNCTION judgement_facet_counts_apply()"
+            ))
+        empty = conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM judgement_facet_counts)")).scalar()
+        if empty:
+            rebuild_facet_counts(conn)
+
+
+if __name__ == "__main__":
+    # 집계 표 재계산: python -m app.services.search.facets
+    from app.db import engine
+
+    ensure_facet_schema(engine)
+    with engine.begin() as conn:
+        rebuild_facet_counts(conn)
+    print("✅ 패싯 집계 재계산 완료")
@@ -0,0 +1,96 @@
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, List, Tuple
+
+from .tokenizer import NGRAM_SIZE, ngrams, query_terms
+
+# Postgres 확장 없이도 돌아가는 순수 파이썬 n-gram 역색인 (BM25 랭킹).
+# 로컬 개발/테스트용 fallback 이고, 운영에서는 tsvector + GIN 인덱스를 사용함.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 3  # 사건명 토큰은 본문보다 가중치를 크게 줌
+
+
+class InMemorySearchIndex:
+    def __init__(self, n: int = NGRAM_SIZE):
+        self.n = n
+        self._postings: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self._doc_terms: Dict[Hashable, Counter] = {}
+        self._doc_len: Dict[Hashable, int] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, doc_id: Hashable, title: str | None, body: str | None) -> None:
+        """문서를 색인. 이미 있는 문서면 교체함."""
+        terms = Counter(ngrams(body, self.n))
+        for term in ngrams(title, self.n):
+            terms[term] += TITLE_BOOST
+        length = sum(terms.values())
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, tf in terms.items():
+                self._postings[term][doc_id] = tf
+            self._doc_terms[doc_id] = terms
+            self._doc_len[doc_id] = length
+            self._total_len += length
+
+    def remove(self, doc_id: Hashable) -> None:
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: Hashable) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+
+    def _expand(self, term: str) -> List[str]:
+        # n보다 짧은 검색어는 접두사 매칭 (예: "법" -> "법원", "법률" ...)
+        if len(term) >= self.n:
+            return [term] if term in self._postings else []
+        return [t for t in self._postings if t.startswith(term)]
+
+    def search(self, q: str, match_all: bool = True) -> List[Tuple[Hashable, float]]:
+        """검색어의 모든 토큰을 포함하는 문서를 (doc_id, score) 점수 내림차순으로 반환.
+
+        match_all=False 면 토큰 중 하나라도 포함하는 문서 (OR), 많이 겹칠수록 점수가 높음.
+        """
+        terms = query_terms(q, self.n)
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if n_docs == 0:
+                return []
+            avg_len = self._total_len / n_docs
+            scores: Dict[Hashable, float] | None = None
+            for term in terms:
+                term_scores: Dict[Hashable, float] = defaultdict(float)
+                for expanded in self._expand(term):
+                    postings = self._postings[expanded]
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, tf in postings.items():
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc_id] / avg_len)
+                        term_scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+                if scores is None:
+                    scores = dict(term_scores)
+                elif match_all:
+                    # AND 검색: 모든 토큰을 포함하는 문서만 남김
+                    scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+                else:
+                    for d, s in term_scores.items():
+                        scores[d] = scores.get(d, 0.0) + s
+                if not scores and match_all:
+                    return []
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
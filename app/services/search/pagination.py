@@ -0,0 +1,88 @@
+import base64
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.orm import Session
+
+from app.utils.cache import TTLCache
+
+load_dotenv()
+
+# total 계산 방식
+#   exact    : count(*) (기존 동작, 매칭 전체를 스캔)
+#   capped   : 최대 SEARCH_TOTAL_CAP 건까지만 세고 그 이상은 "10,000+" 로 표시
+#   estimate : Postgres 실행계획의 예상 행 수 (스캔 없음)
+#   cached   : 검색어별 exact 결과를 TTL 동안 캐시
+#   none     : total 계산 안 함 (무한 스크롤)
+TOTAL_MODES = ("exact", "capped", "estimate", "cached", "none")
+SEARCH_TOTAL_MODE = os.getenv("SEARCH_TOTAL_MODE", "exact")
+SEARCH_TOTAL_CAP = int(os.getenv("SEARCH_TOTAL_CAP", "10000"))
+SEARCH_TOTAL_CACHE_TTL = float(os.getenv("SEARCH_TOTAL_CACHE_TTL", "300"))
+
+_total_cache = TTLCache(maxsize=4096, ttl=SEARCH_TOTAL_CACHE_TTL)
+
+
+def encode_cursor(case_date: datetime, judgement_id) -> str:
+    """(case_date, id) -> 클라이언트에 넘겨줄 불투명 커서 문자열."""
+    raw = json.dumps({"d": case_date.isoformat(), "i": str(judgement_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(raw["d"]), uuid.UUID(raw["i"])
+    except Exception as e:
+        raise ValueError("잘못된 cursor 값입니다.") from e
+
+
+def format_total(total: int | None, exact: bool) -> str | None:
+    if total is None:
+        return None
+    return f"{total:,}" if exact else f"{total:,}+"
+
+
+def count_matches(db: Session, stmt, mode: str, cache_key=None) -> Tuple[int | None, bool]:
+    """stmt(필터가 걸린 select)의 매칭 건수를 mode 에 맞게 계산. (total, 정확한 값인지) 반환."""
+    if mode == "none":
+        return None, False
+    if mode == "capped":
+        limited = (
+            stmt.order_by(None)
+            .with_only_columns(literal_column("1"), maintain_column_froms=True)
+            .limit(SEARCH_TOTAL_CAP + 1)
+        )
+        total = db.scalar(select(func.count()).select_from(limited.subquery())) or 0
+        if total > SEARCH_TOTAL_CAP:
+            return SEARCH_TOTAL_CAP, False
+        return total, True
+    if mode == "estimate":
+        return estimate_rows(db, stmt), False
+    if mode == "cached":
+        cached = _total_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+        total = _exact_count(db, stmt)
+        _total_cache.set(cache_key, total)
+        return total, True
+    return _exact_count(db, stmt), True
+
+
+def _exact_count(db: Session, stmt) -> int:
+    return db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery())) or 0
+
+
+def estimate_rows(db: Session, stmt) -> int:
+    """EXPLAIN 의 예상 행 수. 실제 실행 없이 통계만으로 계산하므로 비용이 거의 없음."""
+    compiled = stmt.order_by(None).compile(bind=db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
@@ -0,0 +1,40 @@
+import re
+from typing import List
+
+# 한국어는 띄어쓰기 단위(어절)에 조사/어미가 붙어 있어 단어 단위 색인으로는 검색이 잘 안 됨.
+# 그래서 어절을 글자 2-gram으로 쪼개서 색인함. ("손해배상을" -> 손해, 해배, 배상, 상을)
+NGRAM_SIZE = 2
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize(text: str | None) -> str:
+    """소문자화 + 특수문자를 공백으로 치환."""
+    if not text:
+        return ""
+    text = _NON_WORD.sub(" ", text.lower()).replace("_", " ")
+    return " ".join(text.split())
+
+
+def ngrams(text: str | None, n: int = NGRAM_SIZE) -> List[str]:
+    """정규화된 텍스트를 어절별 n-gram 토큰 목록으로 변환 (등장 순서 유지)."""
+    tokens: List[str] = []
+    for word in normalize(text).split():
+        if len(word) <= n:
+            tokens.append(word)
+            continue
+        tokens.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return tokens
+
+
+def query_terms(q: str | None, n: int = NGRAM_SIZE) -> List[str]:
+    """검색어용 토큰. 중복 제거만 하고 순서는 유지함.
+
+    n보다 짧은 어절(예: 한 글자 검색어)은 접두사 검색 대상이라 그대로 남김.
+    """
+    return list(dict.fromkeys(ngrams(q, n)))
+
+
+def search_document(text: str | None, n: int = NGRAM_SIZE) -> str:
+    """to_tsvector('simple', ...)에 그대로 넘길 수 있는 공백 구분 토큰 문자열."""
+    return " ".join(ngrams(text, n))
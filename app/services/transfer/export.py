@@ -0,0 +1,119 @@
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.model import Judgement
+
+load_dotenv()
+
+# 서버 측 커서에서 한 번에 가져오는 행 수 (메모리 사용량은 테이블 크기와 무관하게 이 값에 비례)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# 덤프에 들어가는 컬럼 (search_vector 는 가져올 때 다시 계산하므로 제외)
+EXPORT_FIELDS = (
+    "id", "case_name", "case_number", "case_date", "case_result", "case_court", "case_court_code",
+    "case_type", "case_type_code", "case_result_type", "case_result_decision", "case_result_summary",
+    "reference", "reference_case", "case_precedent", "source_id", "created_at", "updated_at",
+)
+
+
+def export_stmt(court: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    stmt = select(*(getattr(Judgement, f) for f in EXPORT_FIELDS))
+    if court:
+        stmt = stmt.where(Judgement.case_court == court)
+    if date_from:
+        stmt = stmt.where(Judgement.case_date >= date_from)
+    if date_to:
+        # case_date 는 DateTime 이라 끝 날짜 당일 전체를 포함
+        stmt = stmt.where(Judgement.case_date < date_to + timedelta(days=1))
+    # (case_date, id) 인덱스 순서로 읽어서 정렬 비용 없이 스트리밍
+    return stmt.order_by(Judgement.case_date, Judgement.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def iter_rows(db: Session, **filters) -> Iterator[Dict]:
+    """필터에 맞는 판례를 서버 측 커서로 EXPORT_BATCH_SIZE 행씩 읽어서 dict 로 내줌."""
+    for row in db.execute(export_stmt(**filters)):
+        yield {field: _jsonable(value) for field, value in zip(EXPORT_FIELDS, row)}
+
+
+def iter_ndjson(db: Session, chunk_rows: int = 200, **filters) -> Iterator[str]:
+    lines = []
+    for row in iter_rows(db, **filters):
+        lines.append(json.dumps(row, ensure_ascii=False) + "\n")
+        if len(lines) >= chunk_rows:
+            yield "".join(lines)
+            lines.clear()
+    if lines:
+        yield "".join(lines)
+
+
+def iter_csv(db: Session, chunk_rows: int = 200, **filters) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for i, row in enumerate(iter_rows(db, **filters), 1):
+        writer.writerow(row)
+        if i % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_export(fmt: str, **filters) -> Iterator[str]:
+    """세션을 직접 열고 닫는 내보내기 제너레이터 (StreamingResponse / CLI 공용)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format 은 {', '.join(EXPORT_FORMATS)} 중 하나여야 합니다.")
+    with SessionLocal() as db:
+        chunks = iter_ndjson(db, **filters) if fmt == "ndjson" else iter_csv(db, **filters)
+        yield from chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="판례 전체/일부를 NDJSON 또는 CSV 로 내보내기")
+    parser.add_argument("output", help="출력 파일 (.gz 면 압축, - 면 표준출력)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--court")
+    parser.add_argument("--date-from", type=date.fromisoformat)
+    parser.add_argument("--date-to", type=date.fromisoformat)
+    args = parser.parse_args()
+
+    chunks = iter_export(args.format, court=args.court, date_from=args.date_from, date_to=args.date_to)
+    if args.output == "-":
+        out = sys.stdout
+    elif args.output.endswith(".gz"):
+        out = gzip.open(args.output, "wt", encoding="utf-8", newline="")
+    else:
+        out = open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    # python -m app.services.transfer.export judgements.ndjson.gz --court 대법원 --date-from 2020-01-01
+    main()
@@ -0,0 +1,283 @@
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import time
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+
+from dotenv import load_dotenv
+
+from app.db import engine
+from app.services.search.tokenizer import search_document
+from app.utils.crawl import UPSERT_FIELDS, content_hash, parse_prec_service
+
+load_dotenv()
+
+# COPY 로 스테이징 테이블에 넣을 때 한 번에 만들어 보내는 CSV 크기 (바이트 근사치)
+IMPORT_COPY_CHUNK = int(os.getenv("IMPORT_COPY_CHUNK", str(1 << 20)))
+
+STAGING_TABLE = "judgements_import"
+# 스테이징 테이블 컬럼 (seq: 파일 내 순서, search_*: 파이썬에서 미리 만든 n-gram 문서)
+STAGING_COLUMNS = (
+    "seq", "id", "case_name", "case_number", "case_date", "case_result", "case_court", "case_court_code",
+    "case_type", "case_type_code", "case_result_type", "case_result_decision", "case_result_summary",
+    "reference", "reference_case", "case_precedent", "source_id", "created_at",
+    "search_name", "search_body", "content_hash",
+)
+_INT_FIELDS = ("case_court_code", "case_type_code")
+_REQUIRED = ("case_name", "case_number", "case_date", "case_result")
+# 빈 문자열은 COPY(CSV) 에서 NULL 로 들어가므로 해시 계산 전에 맞춰 둠
+_NULLABLE_TEXT_FIELDS = (
+    "case_court", "case_type", "case_result_type", "case_result_decision", "case_result_summary",
+    "reference", "reference_case", "case_precedent", "source_id",
+)
+
+_CREATE_STAGING = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    seq bigint NOT NULL,
+    id uuid,
+    case_name text,
+    case_number text,
+    case_date timestamp,
+    case_result text,
+    case_court text,
+    case_court_code integer,
+    case_type text,
+    case_type_code integer,
+    case_result_type text,
+    case_result_decision text,
+    case_result_summary text,
+    reference text,
+    reference_case text,
+    case_precedent text,
+    source_id text,
+    created_at timestamp,
+    search_name text,
+    search_body text,
+    content_hash text
+) ON COMMIT DROP
+"""
+
+_SET_FIELDS = ",\n    ".join(f"{f} = EXCLUDED.{f}" for f in UPSERT_FIELDS)
+_DATA_FIELDS = ", ".join(UPSERT_FIELDS)
+_SELECT_FIELDS = ", ".join(f"s.{f}" for f in UPSERT_FIELDS)
+
+# 파일 안에 같은 (사건번호, 선고일자) 가 여러 번 있으면 마지막 것만 반영.
+# 덤프의 id 는 비어 있거나 이미 다른 행이 쓰고 있으면 새로 발급.
+# 크롤러 upsert 와 같이 내용 해시가 같은 행은 쓰지 않고, (대상, 신규, 수정) 건수를 반환.
+_MERGE = f"""
+WITH src AS (
+    SELECT DISTINCT ON (case_number, case_date) *
+    FROM {STAGING_TABLE}
+    ORDER BY case_number, case_date, seq DESC
+), merged AS (
+    INSERT INTO judgements (
+        id, case_number, case_date, {_DATA_FIELDS}, source_id, search_vector, content_hash, created_at, updated_at
+    )
+    SELECT
+        CASE WHEN s.id IS NULL OR j.id IS NOT NULL THEN gen_random_uuid() ELSE s.id END,
+        s.case_number, s.case_date, {_SELECT_FIELDS}, s.source_id,
+        setweight(to_tsvector('simple', coalesce(s.search_name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(s.search_body, '')), 'B'),
+        s.content_hash, coalesce(s.created_at, LOCALTIMESTAMP), LOCALTIMESTAMP
+    FROM src s
+    LEFT JOIN judgements j ON j.id = s.id
+    ON CONFLICT ON CONSTRAINT uq_case_num_date DO UPDATE SET
+        {_SET_FIELDS},
+        search_vector = EXCLUDED.search_vector,
+        content_hash = EXCLUDED.content_hash,
+        source_id = coalesce(EXCLUDED.source_id, judgements.source_id),
+        updated_at = EXCLUDED.updated_at
+    WHERE judgements.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+       OR (judgements.source_id IS NULL AND EXCLUDED.source_id IS NOT NULL)
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    (SELECT count(*) FROM src),
+    count(*) FILTER (WHERE inserted),
+    count(*) FILTER (WHERE NOT inserted)
+FROM merged
+"""
+
+
+def _open_text(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "ndjson"
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """덤프 파일의 레코드를 순서대로 읽음.
+
+    NDJSON 은 내보내기 형식(컬럼명 키) 과 법령 API 원본 응답({"PrecService": ...}) 을 모두 받음.
+    """
+    fmt = fmt or _detect_format(path)
+    with _open_text(path) as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    text = str(value).strip()
+    if len(text) == 8 and text.isdigit():
+        return datetime.strptime(text, "%Y%m%d")
+    return datetime.fromisoformat(text)
+
+
+def _parse_int(value) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_record(record: Dict) -> Optional[Dict]:
+    """덤프 레코드 -> 스테이징 행 dict. 필수 값이 없거나 형식이 틀리면 None."""
+    if "PrecService" in record:
+        row, _ = parse_prec_service(record)
+        if row is None:
+            return None
+    else:
+        row = dict(record)
+    try:
+        row["case_date"] = _parse_datetime(row.get("case_date"))
+        row["created_at"] = _parse_datetime(row.get("created_at"))
+        row["id"] = uuid.UUID(str(row["id"])) if row.get("id") else None
+    except ValueError:
+        return None
+    for field in _INT_FIELDS:
+        row[field] = _parse_int(row.get(field))
+    for field in _NULLABLE_TEXT_FIELDS:
+        if row.get(field) == "":
+            row[field] = None
+    if any(row.get(field) in (None, "") for field in _REQUIRED):
+        return None
+    row["search_name"] = search_document(row.get("case_name"))
+    row["search_body"] = search_document(row.get("case_precedent"))
+    row["content_hash"] = content_hash(row)
+    return row
+
+
+class _CopyStream(io.TextIOBase):
+    """레코드 이터레이터를 COPY ... FROM STDIN (CSV) 이 읽을 수 있는 파일처럼 감쌈.
+
+    파일 전체를 메모리에 올리지 않고 IMPORT_COPY_CHUNK 크기씩 CSV 로 변환해서 넘김.
+    """
+
+    def __init__(self, records: Iterable[Dict]):
+        self._records = iter(records)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._pending = ""
+        self.rows = 0
+        self.skipped = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self, size: int) -> None:
+        while len(self._pending) < size:
+            record = next(self._records, None)
+            if record is None:
+                break
+            row = normalize_record(record)
+            if row is None:
+                self.skipped += 1
+                continue
+            self.rows += 1
+            row["seq"] = self.rows
+            # CSV COPY 에서 따옴표 없는 빈 값은 NULL
+            self._writer.writerow(["" if row.get(c) is None else row[c] for c in STAGING_COLUMNS])
+            if self._buffer.tell() >= IMPORT_COPY_CHUNK:
+                break
+        self._pending += self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def read(self, size: int = -1) -> str:
+        if size is None or size < 0:
+            size = IMPORT_COPY_CHUNK
+        if len(self._pending) < size:
+            self._fill(size)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def import_records(records: Iterable[Dict]) -> Dict:
+    """레코드를 COPY 로 임시 스테이징 테이블에 넣고 uq_case_num_date 기준으로 한 번에 병합.
+
+    스테이징 적재와 병합은 한 트랜잭션이라 중간에 실패하면 아무 것도 반영되지 않음.
+    """
+    stream = _CopyStream(records)
+    started = time.monotonic()
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(_CREATE_STAGING)
+        cur.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", stream
+        )
+        copied = time.monotonic()
+        cur.execute(_MERGE)
+        distinct, inserted, updated = cur.fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return {
+        "rows": stream.rows,
+        "skipped": stream.skipped,
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": distinct - inserted - updated,
+        "copy_seconds": round(copied - started, 2),
+        "merge_seconds": round(time.monotonic() - copied, 2),
+    }
+
+
+def import_file(path: str, fmt: Optional[str] = None) -> Dict:
+    return import_records(read_records(path, fmt))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NDJSON/CSV 덤프를 COPY + 병합으로 대량 적재")
+    parser.add_argument("paths", nargs="+", help="덤프 파일 (.ndjson/.jsonl/.csv, .gz 가능)")
+    parser.add_argument("--format", choices=("ndjson", "csv"), help="지정하지 않으면 확장자로 판단")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        stats = import_file(path, args.format)
+        print(f"✅ {path}: {stats['rows']}행 적재 -> 신규 {stats['inserted']}, 수정 {stats['updated']}, "
+              f"변경없음 {stats['unchanged']}, 건너뜀 {stats['skipped']} "
+              f"(COPY {stats['copy_seconds']}s, 병합 {stats['merge_seconds']}s)")
+    # 다른 프로세스(API 서버)의 상세 캐시는 TTL 로 만료됨. 임베딩은 retrieval 백필로,
+    # 인용 관계는 python -m app.services.citations.graph 백필로 갱신.
+
+
+if __name__ == "__main__":
+    # python -m app.services.transfer.importer judgements.ndjson.gz archive/*.jsonl
+    main()
@@ -1,11 +1,18 @@
+import hashlib
+import json
 import os
 import re
-from datetime import datetime
+import uuid
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
 import httpx
 from dotenv import load_dotenv
+from sqlalchemy import and_, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.db import SessionLocal
-from app.models.model import Judgement
+from app.models.model import Judgement, search_vector_expr
+from app.utils.metrics import LAW_API_REQUESTS, timed
 
 load_dotenv()
 BASE_URL = os.getenv("CRAWL_BASE_URL")
@@ -26,10 +33,7 @@ def _parse_date(yyyymmdd: str | None):
     except Exception:
         return None
 
-def fetch_law_data(law_id: str):
-    url = f"{BASE_URL}{law_id}"
-    resp = httpx.get(url, timeout=15)
-    resp.raise_for_status()
+def parse_law_response(resp: httpx.Response):
     try:
         return resp.json()
     except Exception:
@@ -39,90 +43,217 @@ def fetch_law_data(law_id: str):
             "raw": resp.text[:300]
         }
 
-def save_law_data_to_db(data: dict):
+def fetch_law_data(law_id: str):
+    url = f"{BASE_URL}{law_id}"
+    with timed("law_api"):
+        resp = httpx.get(url, timeout=15)
+    LAW_API_REQUESTS.inc(status=resp.status_code)
+    resp.raise_for_status()
+    return parse_law_response(resp)
+
+# 판례 저장(커밋) 후 호출되는 콜백 목록. 저장된 행(dict, id 포함) 리스트를 인자로 받음.
+_save_listeners: List[Callable[[List[dict]], None]] = []
+
+def register_save_listener(fn: Callable[[List[dict]], None]) -> None:
+    if fn not in _save_listeners:
+        _save_listeners.append(fn)
+
+def _notify_saved(rows: List[dict]) -> None:
+    for fn in _save_listeners:
+        try:
+            fn(rows)
+        except Exception as e:
+            print(f"⚠️  save listener 실패: {e}")
+
+def parse_prec_service(data: dict, source_id: Optional[str] = None) -> Tuple[Optional[dict], Optional[str]]:
+    """PrecService 응답 -> judgements 행 dict. 실패하면 (None, 사유).
+
+    source_id 는 조회에 사용한 판례일련번호. 없으면 응답의 판례정보일련번호를 사용.
+    """
     if not isinstance(data, dict) or "PrecService" not in data:
-        return {"saved": False, "reason": "PrecService not found in response"}
+        return None, "PrecService not found in response"
 
     p = data["PrecService"]
 
-    case_name = p.get("사건명")
     case_number = p.get("사건번호")
     case_date = p.get("선고일자")
-    case_result = p.get("선고")
-    case_court = p.get("법원명")
-    case_court_code = p.get("법원종류코드")
-    case_type = p.get("사건종류명")
-    case_type_code = p.get("사건종류코드")
-    case_result_type = p.get("판결유형")
-    case_result_decision = _strip_html(p.get("판시사항"))
-    case_result_summary = _strip_html(p.get("판결요지"))
-    reference = _strip_html(p.get("참조조문"))
-    reference_case = _strip_html(p.get("참조판례"))
-    case_precedent = _strip_html(p.get("판례요지"))
-
     if not case_number or not case_date:
-        return {"saved": False, "reason": "missing 사건번호 or 선고일자"}
+        return None, "missing 사건번호 or 선고일자"
 
     case_date_parsed = _parse_date(case_date)
+    if case_date_parsed is None:
+        return None, f"invalid 선고일자: {case_date}"
 
-    db = SessionLocal()
-    try:
-        obj = db.query(Judgement).filter(
-            Judgement.case_number == case_number,
-            Judgement.case_date == case_date_parsed
-        ).first()
-        
-        if obj is None:
-            obj = Judgement(
-                case_name=case_name,
-                case_number=case_number,
-                case_date=case_date_parsed,
-                case_result=case_result,
-                case_court=case_court,
-                case_court_code=case_court_code,
-                case_type=case_type,
-                case_type_code=case_type_code,
-                case_result_type=case_result_type,
-                case_result_decision=case_result_decision,
-                case_result_summary=case_result_summary,
-                reference=reference,
-                reference_case=reference_case,
-                case_precedent=case_precedent,
-            )
-            db.add(obj)
-        else:
-            for field, value in [
-                ("case_name", case_name),
-                ("case_number", case_number),
-                ("case_date", case_date_parsed),
-                ("case_result", case_result),
-                ("case_court", case_court),
-                ("case_court_code", case_court_code),
-                ("case_type", case_type),
-                ("case_type_code", case_type_code),
-                ("case_result_type", case_result_type),
-                ("case_result_decision", case_result_decision),
-                ("case_result_summary", case_result_summary),
-                ("reference", reference),
-                ("reference_case", reference_case),
-                ("case_precedent", case_precedent),
-            ]:
-                setattr(obj, field, value)
-
-        db.commit()
-        return {"saved": True, "case_number": case_number}
-    except Exception as e:
-        db.rollback()
-        return {"saved": False, "reason": str(e)}
-    finally:
-        db.close()
+    return {
+        "case_name": p.get("사건명"),
+        "case_number": case_number,
+        "case_date": case_date_parsed,
+        "case_result": p.get("선고"),
+        "case_court": p.get("법원명"),
+        "case_court_code": p.get("법원종류코드"),
+        "case_type": p.get("사건종류명"),
+        "case_type_code": p.get("사건종류코드"),
+        "case_result_type": p.get("판결유형"),
+        "case_result_decision": _strip_html(p.get("판시사항")),
+        "case_result_summary": _strip_html(p.get("판결요지")),
+        "reference": _strip_html(p.get("참조조문")),
+        "reference_case": _strip_html(p.get("참조판례")),
+        "case_precedent": _strip_html(p.get("판례요지")),
+        "source_id": str(source_id or p.get("판례정보일련번호") or "").strip() or None,
+    }, None
+
+# 충돌(같은 사건번호+선고일자) 시 덮어쓰는 컬럼
+UPSERT_FIELDS = (
+    "case_name", "case_result", "case_court", "case_court_code", "case_type", "case_type_code",
+    "case_result_type", "case_result_decision", "case_result_summary",
+    "reference", "reference_case", "case_precedent",
+)
+
+# 변경 여부 비교에 쓰는 필드 (수집 시각/원본 번호 같은 메타데이터는 제외)
+HASH_FIELDS = ("case_number", "case_date") + UPSERT_FIELDS
+
+
+def _hash_value(value):
+    # 크롤러(문자열 코드, date) 와 덤프 가져오기(int 코드, datetime) 가 같은 해시를 내도록 맞춤
+    if value is None:
+        return None
+    return _as_date(value).isoformat() if isinstance(value, (date, datetime)) else str(value)
+
+
+def content_hash(row: dict) -> str:
+    """_strip_html 까지 끝난 정규화 행의 내용 해시 (sha256 hex)."""
+    payload = {field: _hash_value(row.get(field)) for field in HASH_FIELDS}
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _upsert_stmt(rows: List[dict]):
+    """판례 upsert. 내용 해시가 같으면 쓰지 않고(RETURNING 에도 안 나옴), 새로 넣은 행은 inserted=True."""
+    now = datetime.now()
+    values = [
+        {
+            **row,
+            "content_hash": content_hash(row),
+            "id": uuid.uuid4(),
+            "created_at": now,
+            "updated_at": now,
+            "search_vector": search_vector_expr(row["case_name"], row["case_precedent"]),
+        }
+        for row in rows
+    ]
+    stmt = pg_insert(Judgement).values(values)
+    return stmt.on_conflict_do_update(
+        constraint="uq_case_num_date",
+        set_={
+            **{field: stmt.excluded[field] for field in UPSERT_FIELDS},
+            "search_vector": stmt.excluded.search_vector,
+            "content_hash": stmt.excluded.content_hash,
+            "source_id": func.coalesce(stmt.excluded.source_id, Judgement.source_id),
+            "updated_at": now,
+        },
+        # 내용이 같으면 UPDATE 자체를 건너뜀 (새 튜플 버전/updated_at 갱신/캐시 무효화 없음).
+        # 원본 판례일련번호만 새로 알게 된 경우는 기록함.
+        where=or_(
+            Judgement.content_hash.is_distinct_from(stmt.excluded.content_hash),
+            and_(Judgement.source_id.is_(None), stmt.excluded.source_id.is_not(None)),
+        ),
+    ).returning(
+        Judgement.id, Judgement.case_number, Judgement.case_date,
+        # 방금 INSERT 된 튜플은 xmax 가 0 (UPDATE 된 튜플은 현재 트랜잭션 id)
+        literal_column("(xmax = 0)").label("inserted"),
+    )
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+def save_law_data_batch(datas: List[dict], source_ids: Optional[List[str]] = None) -> List[dict]:
+    """여러 PrecService 응답을 한 트랜잭션, 한 번의 INSERT ... ON CONFLICT 로 저장.
+
+    입력 순서대로 레코드별 {"saved": ..., "status": inserted/updated/unchanged, ...} 결과를 반환함.
+    배치 전체가 실패하면 SAVEPOINT 로 한 건씩 다시 저장해서 실패한 레코드만 골라냄.
+    """
+    results: List[Optional[dict]] = [None] * len(datas)
+    # 같은 배치 안에 중복 키가 있으면 ON CONFLICT 가 실패하므로 마지막 값만 남김
+    pending: Dict[tuple, Tuple[dict, List[int]]] = {}
+    for i, data in enumerate(datas):
+        row, reason = parse_prec_service(data, source_ids[i] if source_ids else None)
+        if row is None:
+            results[i] = {"saved": False, "reason": reason}
+            continue
+        key = (row["case_number"], row["case_date"])
+        indexes = pending[key][1] if key in pending else []
+        pending[key] = (row, indexes + [i])
+
+    if pending:
+        rows = [row for row, _ in pending.values()]
+        # RETURNING 에 나온 행만 실제로 쓰인 것 (나머지는 내용이 같아서 건너뜀)
+        written: Dict[tuple, dict] = {}
+        failed: Dict[tuple, str] = {}
+        db = SessionLocal()
+        try:
+            try:
+                for r in db.execute(_upsert_stmt(rows)):
+                    written[(r.case_number, _as_date(r.case_date))] = {"id": r.id, "inserted": r.inserted}
+                db.commit()
+            except Exception:
+                db.rollback()
+                written.clear()
+                for row in rows:
+                    key = (row["case_number"], row["case_date"])
+                    try:
+                        with db.begin_nested():
+                            r = db.execute(_upsert_stmt([row])).first()
+                        if r is not None:
+                            written[key] = {"id": r.id, "inserted": r.inserted}
+                    except Exception as e:
+                        failed[key] = str(e)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            written.clear()
+            failed = {key: str(e) for key in pending}
+        finally:
+            db.close()
+
+        saved_rows = []
+        for key, (row, indexes) in pending.items():
+            if key in failed:
+                result = {"saved": False, "reason": failed[key]}
+            elif key in written:
+                saved_rows.append({**row, "id": written[key]["id"]})
+                status = "inserted" if written[key]["inserted"] else "updated"
+                result = {"saved": True, "status": status, "case_number": row["case_number"]}
+            else:
+                result = {"saved": True, "status": "unchanged", "case_number": row["case_number"]}
+            for i in indexes:
+                results[i] = result
+        # 바뀐 행만 알림 -> 재수집해도 내용이 같으면 캐시/색인 갱신이 일어나지 않음
+        if saved_rows:
+            _notify_saved(saved_rows)
+
+    return results
+
+def save_law_data_to_db(data: dict, source_id: Optional[str] = None):
+    return save_law_data_batch([data], [source_id] if source_id else None)[0]
+
+def existing_source_ids(ids: List[str]) -> set:
+    """이미 DB에 있는 판례일련번호 집합 (증분 동기화 시 재조회 생략용)."""
+    if not ids:
+        return set()
+    with SessionLocal() as db:
+        rows = db.execute(select(Judgement.source_id).where(Judgement.source_id.in_(ids))).scalars()
+        return set(rows)
 
 def law_data_list(keyword: str, page: int):
     url = f"{BASE_LIST_URL}{keyword}{'&page='}{page}"
-    resp = httpx.get(url, timeout=15)
+    with timed("law_api"):
+        resp = httpx.get(url, timeout=15)
+    LAW_API_REQUESTS.inc(status=resp.status_code)
     resp.raise_for_status()
-    data = resp.json()
+    return parse_id_list(resp.json())
 
+def parse_id_list(data) -> list[str]:
+    """판례 목록 응답에서 판례일련번호 목록만 추출."""
     items = []
     if isinstance(data, dict):
         prec_search = data.get("PrecSearch")
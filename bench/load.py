@@ -0,0 +1,244 @@
+"""고정 동시성으로 주요 엔드포인트에 부하를 주고 처리량과 p50/p95/p99 지연을 기록.
+
+사용 (백엔드와 mock 법령 API 가 떠 있고 bench.seed 로 시드가 끝난 상태):
+    python -m bench.load --base-url http://localhost:8000 --rows 10000 --concurrency 16
+    python -m bench.load --scenarios search,detail --update-baseline   # 기준값 갱신
+    python -m bench.load --fail-on-regression                          # CI: 기준 대비 악화 시 exit 1
+
+결과는 --output(기본 bench/results/latest.json) 에 저장하고, bench/baseline.json 과 비교한 표를 출력함.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from bench.synthetic import DEFAULT_SEED, TERMS, case_number, search_queries
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+
+# 시나리오가 만드는 요청: (method, path, query params, json body)
+Request = Tuple[str, str, Optional[dict], Optional[dict]]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: List[float] = field(default_factory=list)  # 성공한 요청의 지연(초)
+    errors: int = 0
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict:
+        total = len(self.latencies) + self.errors
+        ordered = sorted(self.latencies)
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "throughput_rps": round(len(self.latencies) / self.elapsed, 2) if self.elapsed else 0.0,
+            "mean_ms": round(1000 * sum(ordered) / len(ordered), 2) if ordered else None,
+            "p50_ms": percentile_ms(ordered, 50),
+            "p95_ms": percentile_ms(ordered, 95),
+            "p99_ms": percentile_ms(ordered, 99),
+            "status": dict(sorted(self.status_counts.items())),
+        }
+
+
+def percentile_ms(ordered: List[float], pct: float) -> Optional[float]:
+    """nearest-rank 백분위수 (ordered 는 정렬된 초 단위 값)."""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(1000 * ordered[rank - 1], 2)
+
+
+def build_scenarios(rows: int, seed: int, chat_model: str) -> Dict[str, Callable[[random.Random], Request]]:
+    queries = search_queries(200, seed)
+
+    def search(rng: random.Random) -> Request:
+        return "GET", "/api/v1/rulings/search", {"q": rng.choice(queries), "limit": 10, "total": "capped"}, None
+
+    def detail(rng: random.Random) -> Request:
+        return "GET", f"/api/v1/rulings/{case_number(rng.randrange(rows), seed)}", None, None
+
+    def crawl(rng: random.Random) -> Request:
+        # mock 법령 API 의 목록 -> 본문 조회 -> 저장까지 한 페이지씩
+        return "POST", "/judgement", {"header": rng.choice(TERMS), "page": rng.randint(1, 20)}, None
+
+    def chatbot(rng: random.Random) -> Request:
+        term = rng.choice(TERMS)
+        body = {"user_question": f"{term} 관련 판례의 판단 기준을 알려주세요.",
+                "db_should_query_this": term, "model_type": chat_model, "top_k": 3}
+        return "POST", "/chatbot/generate", None, body
+
+    return {"search": search, "detail": detail, "crawl": crawl, "chatbot": chatbot}
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, make_request: Callable[[random.Random], Request],
+                       requests: int, concurrency: int, warmup: int, seed: int) -> ScenarioResult:
+    rng = random.Random(f"{seed}:{name}")
+    # 요청 목록을 미리 만들어서 실행마다 같은 순서/같은 대상을 호출
+    planned = [make_request(rng) for _ in range(warmup + requests)]
+    result = ScenarioResult(name)
+
+    async def send(req: Request, record: bool) -> None:
+        method, path, params, body = req
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, path, params=params, json=body)
+            status = str(resp.status_code)
+            ok = resp.status_code < 400
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+        elapsed = time.perf_counter() - started
+        if not record:
+            return
+        result.status_counts[status] = result.status_counts.get(status, 0) + 1
+        if ok:
+            result.latencies.append(elapsed)
+        else:
+            result.errors += 1
+
+    async def worker(queue: "asyncio.Queue[Request]", record: bool) -> None:
+        while True:
+            try:
+                req = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await send(req, record)
+
+    async def run(reqs: List[Request], record: bool) -> float:
+        queue: "asyncio.Queue[Request]" = asyncio.Queue()
+        for req in reqs:
+            queue.put_nowait(req)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(queue, record) for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    if warmup:
+        await run(planned[:warmup], record=False)
+    result.elapsed = await run(planned[warmup:], record=True)
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """(출력할 표 줄들, 회귀 목록). 지연은 증가, 처리량은 감소가 threshold 비율을 넘으면 회귀."""
+    lines = [f"{'scenario':<10} {'metric':<15} {'baseline':>10} {'current':>10} {'change':>9}"]
+    regressions = []
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        for metric, higher_is_worse in (("throughput_rps", False), ("p50_ms", True), ("p95_ms", True),
+                                        ("p99_ms", True), ("error_rate", True)):
+            new = cur.get(metric)
+            old = base.get(metric) if base else None
+            if old is None or new is None:
+                lines.append(f"{name:<10} {metric:<15} {'-':>10} {str(new):>10} {'':>9}")
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else math.inf)
+            worse = change > threshold if higher_is_worse else change < -threshold
+            mark = "  ❌" if worse else ""
+            if worse:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+            lines.append(f"{name:<10} {metric:<15} {old:>10} {new:>10} {change:>+8.1%}{mark}")
+    return lines, regressions
+
+
+async def main_async(args) -> int:
+    scenarios = build_scenarios(args.rows, args.seed, args.chat_model)
+    names = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [n for n in names if n not in scenarios]
+    if unknown:
+        raise SystemExit(f"알 수 없는 시나리오: {', '.join(unknown)} (가능: {', '.join(scenarios)})")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    current = {
+        "meta": {
+            "commit": _git_commit(), "python": platform.python_version(), "base_url": args.base_url,
+            "rows": args.rows, "seed": args.seed, "concurrency": args.concurrency,
+            "requests": args.requests, "warmup": args.warmup,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "scenarios": {},
+    }
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        for name in names:
+            # LLM 생성은 요청당 수 초라 요청 수를 줄여서 실행
+            requests = args.chat_requests if name == "chatbot" else args.requests
+            print(f"▶ {name}: {requests}건, 동시성 {args.concurrency}")
+            result = await run_scenario(client, name, scenarios[name], requests, args.concurrency,
+                                        min(args.warmup, requests), args.seed)
+            current["scenarios"][name] = result.summary()
+            s = current["scenarios"][name]
+            print(f"  {s['throughput_rps']} req/s, p50 {s['p50_ms']}ms, p95 {s['p95_ms']}ms, "
+                  f"p99 {s['p99_ms']}ms, 오류 {s['errors']}건")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"결과 저장: {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline or not baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+        # 이번에 돌린 시나리오만 갱신하고 나머지 기준값은 유지
+        baseline = {"meta": current["meta"], "scenarios": {**baseline.get("scenarios", {}), **current["scenarios"]}}
+        baseline_path.write_text(json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"기준값 갱신: {baseline_path}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    lines, regressions = compare(current, baseline, args.threshold)
+    print(f"\n기준값({baseline.get('meta', {}).get('commit')}) 대비:")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n⚠️  {args.threshold:.0%} 넘게 나빠진 항목:")
+        for r in regressions:
+            print(f"  - {r}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="판례 백엔드 부하 테스트")
+    parser.add_argument("--base-url", default=os.getenv("BENCH_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--scenarios", default="search,detail,crawl",
+                        help="쉼표로 구분: search, detail, crawl, chatbot")
+    parser.add_argument("--rows", type=int, default=10000, help="bench.seed 로 넣은 행 수 (상세 조회 대상)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="시나리오별 측정 요청 수")
+    parser.add_argument("--chat-requests", type=int, default=20, help="chatbot 시나리오 측정 요청 수")
+    parser.add_argument("--chat-model", default="huggingface",
+                        help="chatbot 시나리오의 model_type (HF_MODEL_NAME 으로 작은 모델 지정 권장)")
+    parser.add_argument("--warmup", type=int, default=20, help="측정에서 제외하는 워밍업 요청 수")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 볼 변화 비율")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""로컬에서 띄우는 법령 API 대역 (CRAWL_BASE_URL / CRAWL_BASE_LIST_URL 대신 사용).
+
+사용:
+    python -m bench.mock_law_api --port 9100 --latency-ms 30
+
+백엔드는 다음 환경변수로 띄움 (크롤러는 URL 뒤에 판례일련번호 / 검색어&page= 를 그대로 붙임):
+    CRAWL_BASE_URL=http://127.0.0.1:9100/DRF/lawService.do?target=prec&type=JSON&ID=
+    CRAWL_BASE_LIST_URL=http://127.0.0.1:9100/DRF/lawSearch.do?target=prec&type=JSON&query=
+"""
+import argparse
+import asyncio
+import os
+import random
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+from bench.synthetic import DEFAULT_SEED, SOURCE_ID_BASE, prec_service
+
+MOCK_LAW_API_LATENCY_MS = float(os.getenv("MOCK_LAW_API_LATENCY_MS", "30"))  # 평균 응답 지연
+MOCK_LAW_API_JITTER_MS = float(os.getenv("MOCK_LAW_API_JITTER_MS", "10"))
+MOCK_LAW_API_ERROR_RATE = float(os.getenv("MOCK_LAW_API_ERROR_RATE", "0"))   # 503 을 돌려줄 비율 (재시도 확인용)
+MOCK_LAW_API_TOTAL = int(os.getenv("MOCK_LAW_API_TOTAL", "10000"))          # 목록에 나오는 전체 판례 수
+MOCK_LAW_API_PAGE_SIZE = int(os.getenv("MOCK_LAW_API_PAGE_SIZE", "20"))
+MOCK_LAW_API_SEED = int(os.getenv("MOCK_LAW_API_SEED", str(DEFAULT_SEED)))
+
+app = FastAPI()
+# 지연/오류는 재현 가능하도록 고정 시드
+_rng = random.Random(MOCK_LAW_API_SEED)
+
+
+async def _delay() -> bool:
+    """응답 지연을 흉내내고, 오류를 낼 차례면 True."""
+    latency = max(0.0, MOCK_LAW_API_LATENCY_MS + _rng.uniform(-1, 1) * MOCK_LAW_API_JITTER_MS)
+    await asyncio.sleep(latency / 1000)
+    return _rng.random() < MOCK_LAW_API_ERROR_RATE
+
+
+@app.get("/DRF/lawService.do")
+async def law_service(ID: str = Query(...)):
+    if await _delay():
+        return JSONResponse(status_code=503, content={"error": "temporarily unavailable"})
+    try:
+        index = int(ID) - SOURCE_ID_BASE
+    except ValueError:
+        index = -1
+    if not 0 <= index < MOCK_LAW_API_TOTAL:
+        # 실제 API 도 없는 번호면 PrecService 없이 응답함
+        return {"Law": "일치하는 판례가 없습니다."}
+    return prec_service(index, MOCK_LAW_API_SEED)
+
+
+@app.get("/DRF/lawSearch.do")
+async def law_search(query: str = Query(""), page: int = Query(1, ge=1)):
+    if await _delay():
+        return JSONResponse(status_code=503, content={"error": "temporarily unavailable"})
+    # 검색어마다 시작 위치를 다르게 해서 키워드별로 다른 판례가 나오게 함
+    offset = sum(map(ord, query)) % MOCK_LAW_API_TOTAL
+    start = (page - 1) * MOCK_LAW_API_PAGE_SIZE
+    ids = [
+        SOURCE_ID_BASE + (offset + i) % MOCK_LAW_API_TOTAL
+        for i in range(start, min(start + MOCK_LAW_API_PAGE_SIZE, MOCK_LAW_API_TOTAL))
+    ]
+    return {
+        "PrecSearch": {
+            "키워드": query,
+            "page": page,
+            "totalCnt": MOCK_LAW_API_TOTAL,
+            "prec": [{"판례일련번호": i} for i in ids],
+        }
+    }
+
+
+def main() -> None:
+    global MOCK_LAW_API_LATENCY_MS, MOCK_LAW_API_ERROR_RATE
+    parser = argparse.ArgumentParser(description="벤치마크용 법령 API mock 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=MOCK_LAW_API_LATENCY_MS)
+    parser.add_argument("--error-rate", type=float, default=MOCK_LAW_API_ERROR_RATE)
+    args = parser.parse_args()
+    MOCK_LAW_API_LATENCY_MS = args.latency_ms
+    MOCK_LAW_API_ERROR_RATE = args.error_rate
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""벤치마크용 합성 판례를 DB 에 채움 (크롤러와 같은 save_law_data_batch 경로로 저장).
+
+사용:
+    DATABASE_URL=... python -m bench.seed --rows 20000
+
+같은 --seed 로 다시 실행하면 같은 행을 upsert 하므로 여러 번 돌려도 행 수가 늘지 않음.
+"""
+import argparse
+import time
+
+from bench.synthetic import DEFAULT_SEED, SOURCE_ID_BASE, prec_service
+
+
+def seed(rows: int, seed_value: int = DEFAULT_SEED, batch_size: int = 500) -> int:
+    from app.db import Base, engine
+    from app.services.search.engine import ensure_search_schema
+    from app.utils.crawl import save_law_data_batch
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_schema(engine)
+
+    saved = 0
+    started = time.monotonic()
+    for start in range(0, rows, batch_size):
+        indexes = range(start, min(start + batch_size, rows))
+        results = save_law_data_batch(
+            [prec_service(i, seed_value) for i in indexes],
+            [str(SOURCE_ID_BASE + i) for i in indexes],
+        )
+        saved += sum(1 for r in results if r["saved"])
+        print(f"  {start + len(indexes)}/{rows} 행 저장 ({time.monotonic() - started:.1f}s)")
+    return saved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 판례 시드")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    saved = seed(args.rows, args.seed, args.batch_size)
+    print(f"✅ {args.rows}건 중 {saved}건 저장됨")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""벤치마크용 합성 판례 데이터.
+
+같은 (seed, index) 는 항상 같은 판례를 만들기 때문에 DB 시드, mock 법령 API, 부하 테스트가
+서로 같은 사건번호/판례일련번호를 공유함.
+"""
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+
+DEFAULT_SEED = 20240901
+# mock 법령 API 의 판례일련번호 = SOURCE_ID_BASE + index (실제 번호와 겹치지 않게 큰 값)
+SOURCE_ID_BASE = 9_000_000
+
+COURTS = [("대법원", "400201"), ("서울고등법원", "400202"), ("서울중앙지방법원", "400203"), ("부산지방법원", "400204")]
+CASE_TYPES = [("민사", "400101", "다"), ("형사", "400102", "도"), ("일반행정", "400103", "두"), ("가사", "400104", "므")]
+RESULT_TYPES = ["판결", "결정"]
+RESULTS = ["선고", "파기환송", "상고기각", "원심판결 파기"]
+
+# 검색 시나리오에서도 쓰는 법률 용어
+TERMS = [
+    "손해배상", "소유권이전등기", "부당이득반환", "근로기준법", "임대차보증금", "채무불이행", "명예훼손",
+    "교통사고처리특례법", "횡령", "사기", "업무상배임", "하자담보책임", "상속재산분할", "이혼", "양육비",
+    "산업재해", "부당해고", "개인정보보호법", "저작권침해", "건축허가", "조세부과처분", "국가배상",
+    "공무집행방해", "강제집행", "가압류", "유치권", "근저당권", "보험금", "약관", "신의성실의 원칙",
+]
+LAWS = ["민법", "형법", "상법", "민사소송법", "형사소송법", "행정소송법", "근로기준법", "국가배상법"]
+CONNECTIVES = [
+    "에 관한 법리를 오해하여", "의 성립 여부를 판단함에 있어", "을 인정한 원심의 판단은", "에 대한 증명책임은",
+    "의 범위를 정할 때에는", "과 관련하여 피고가 주장하는", "이 문제된 사안에서", "의 요건을 갖추었는지는",
+]
+ENDINGS = [
+    "정당하다.", "수긍할 수 없다.", "타당하다고 볼 수 없다.", "위법이 있다.", "그대로 유지되어야 한다.",
+    "판결에 영향을 미친 잘못이 없다.", "심리를 다하지 아니한 잘못이 있다.",
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    return f"{rng.choice(TERMS)}{rng.choice(CONNECTIVES)} {rng.choice(TERMS)}에 관한 원심의 판단은 {rng.choice(ENDINGS)}"
+
+
+def _paragraph(rng: random.Random, min_chars: int, max_chars: int) -> str:
+    target = rng.randint(min_chars, max_chars)
+    sentences: List[str] = []
+    length = 0
+    while length < target:
+        s = _sentence(rng)
+        sentences.append(s)
+        length += len(s) + 1
+    return " ".join(sentences)
+
+
+def case_number(index: int, seed: int = DEFAULT_SEED) -> str:
+    rng = random.Random(seed * 1_000_003 + index)
+    year = 1990 + rng.randrange(35)
+    kind = CASE_TYPES[index % len(CASE_TYPES)][2]
+    return f"{year}{kind}{10000 + index}"
+
+
+def prec_service(index: int, seed: int = DEFAULT_SEED) -> Dict:
+    """index 번째 합성 판례를 법령 API(PrecService) 응답 형식으로 생성.
+
+    글자 수는 실제 판례와 비슷하게: 판시사항 200~600자, 판결요지 300~1500자, 판례 본문 2000~8000자.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    year = 1990 + rng.randrange(35)
+    court, court_code = rng.choice(COURTS)
+    case_type, case_type_code, _ = CASE_TYPES[index % len(CASE_TYPES)]
+    decided = date(year, 1, 1) + timedelta(days=rng.randrange(365))
+    title_terms = rng.sample(TERMS, 2)
+    references = ", ".join(f"{rng.choice(LAWS)} 제{rng.randint(1, 800)}조" for _ in range(rng.randint(1, 4)))
+    return {
+        "PrecService": {
+            "판례정보일련번호": str(SOURCE_ID_BASE + index),
+            "사건명": f"{title_terms[0]}{'ㆍ'}{title_terms[1]}",
+            "사건번호": case_number(index, seed),
+            "선고일자": decided.strftime("%Y%m%d"),
+            "선고": rng.choice(RESULTS),
+            "법원명": court,
+            "법원종류코드": court_code,
+            "사건종류명": case_type,
+            "사건종류코드": case_type_code,
+            "판결유형": rng.choice(RESULT_TYPES),
+            "판시사항": _paragraph(rng, 200, 600),
+            "판결요지": _paragraph(rng, 300, 1500),
+            "참조조문": references,
+            "참조판례": f"대법원 {year - rng.randint(1, 10)}. {rng.randint(1, 12)}. {rng.randint(1, 28)}. 선고 {case_number(rng.randrange(index + 1), seed)} 판결",
+            "판례요지": "<br/>".join(_paragraph(rng, 400, 1600) for _ in range(rng.randint(2, 5))),
+        }
+    }
+
+
+def search_queries(count: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """검색 시나리오용 질의어 (단어 1~2개)."""
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(TERMS, rng.choice((1, 1, 2)))) for _ in range(count)]